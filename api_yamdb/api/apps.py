@@ -5,3 +5,6 @@ class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
     label = 'api'
+
+    def ready(self):
+        import api.signals  # noqa: F401
@@ -0,0 +1,154 @@
+"""
+JWT-аутентификация без запроса пользователя к БД.
+
+Токен, выданный send_token, содержит роль и флаги пользователя - всё,
+что нужно пермишенам. Эти утверждения считаются верными до claims_exp,
+то есть JWT_CLAIMS_LIFETIME после выдачи токена: столько действует старая
+роль после её изменения. Для более старых токенов роль берётся из кэша,
+а при промахе - из БД. Остальные поля пользователя загружаются из БД при
+первом обращении к ним.
+
+При сохранении или удалении пользователя его текущие утверждения
+записываются в кэш на JWT_CLAIMS_LIFETIME, и запись в кэше важнее
+утверждений токена. Поэтому деактивация и удаление действуют сразу, если
+запись не вытеснена из кэша раньше срока.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken, TokenError)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.cache import get_cache
+
+User = get_user_model()
+
+CLAIMS = ('role', 'is_superuser', 'is_staff', 'is_active')
+CLAIMS_EXP = 'claims_exp'
+CLAIMS_KEY_TEMPLATE = 'auth:claims:{user_id}'
+DEFAULT_CLAIMS_LIFETIME = timedelta(minutes=5)
+
+
+def get_claims_lifetime():
+    return getattr(settings, 'JWT_CLAIMS_LIFETIME', DEFAULT_CLAIMS_LIFETIME)
+
+
+def get_cached_claims(user_id):
+    return get_cache().get(CLAIMS_KEY_TEMPLATE.format(user_id=user_id))
+
+
+def get_user_claims(user_id):
+    """Текущие роль и флаги пользователя или None, если его нет."""
+    claims = get_cached_claims(user_id)
+    if claims is None:
+        claims = User.objects.filter(pk=user_id).values(*CLAIMS).first()
+        if claims is None:
+            return None
+        remember_user_claims(user_id, claims)
+    return claims
+
+
+def remember_user_claims(user_id, claims):
+    get_cache().set(
+        CLAIMS_KEY_TEMPLATE.format(user_id=user_id),
+        claims,
+        get_claims_lifetime().total_seconds()
+    )
+
+
+class ClaimsAccessToken(AccessToken):
+    """Access-токен с ролью и флагами пользователя."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        token.set_exp(claim=CLAIMS_EXP, lifetime=get_claims_lifetime())
+        return token
+
+
+class TokenUser:
+    """
+    Пользователь из утверждений токена.
+
+    Поля, которых нет в токене, берутся у модели User, загруженной из БД
+    при первом обращении к ним.
+    """
+
+    is_anonymous = False
+    is_authenticated = True
+
+    ADMIN = User.ADMIN
+    MODERATOR = User.MODERATOR
+    is_admin = User.is_admin
+    is_moderator = User.is_moderator
+
+    def __init__(self, user_id, claims):
+        self.id = self.pk = user_id
+        for claim in CLAIMS:
+            setattr(self, claim, claims[claim])
+
+    @cached_property
+    def user(self):
+        try:
+            return User.objects.get(pk=self.pk)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        return isinstance(other, (TokenUser, User)) and self.pk == other.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __str__(self):
+        return f'TokenUser {self.pk}'
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """Аутентификация по ClaimsAccessToken без загрузки пользователя."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                'Token contained no recognizable user identification'
+            )
+        claims = get_cached_claims(user_id)
+        if claims is None:
+            claims = self.get_token_claims(validated_token)
+        if claims is None:
+            claims = get_user_claims(user_id)
+        if claims is None:
+            raise AuthenticationFailed(
+                'User not found', code='user_not_found'
+            )
+        if not claims['is_active']:
+            raise AuthenticationFailed(
+                'User is inactive', code='user_inactive'
+            )
+        return TokenUser(user_id, claims)
+
+    def get_token_claims(self, validated_token):
+        """Утверждения токена, если они есть и ещё не устарели."""
+        if any(claim not in validated_token for claim in CLAIMS):
+            return None
+        try:
+            validated_token.check_exp(CLAIMS_EXP)
+        except TokenError:
+            return None
+        return {claim: validated_token[claim] for claim in CLAIMS}
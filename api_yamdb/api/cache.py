@@ -0,0 +1,74 @@
+"""
+Кэш ответов GET-запросов с инвалидацией по версиям моделей.
+
+Каждой модели соответствует версия в кэше, которая меняется при любом
+сохранении или удалении её объектов. Версии всех моделей, от которых
+зависит ответ, входят в ключ, поэтому после записи старые ответы
+просто перестают находиться и вытесняются по таймауту.
+"""
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY_TEMPLATE = 'api-cache:version:{label}'
+RESPONSE_KEY_TEMPLATE = 'api-cache:response:{digest}'
+CACHE_HEADER = 'X-Cache'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def bump_version(model):
+    """Делает недействительными все ответы, зависящие от модели."""
+    get_cache().set(
+        VERSION_KEY_TEMPLATE.format(label=model._meta.label_lower),
+        uuid.uuid4().hex,
+        None
+    )
+
+
+def get_versions(models):
+    cache = get_cache()
+    keys = [
+        VERSION_KEY_TEMPLATE.format(label=model._meta.label_lower)
+        for model in models
+    ]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Версия могла быть вытеснена: новая случайная версия не
+            # совпадёт ни с одним из закэшированных ранее ответов.
+            cache.add(key, uuid.uuid4().hex, None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def get_response_key(request, models):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    parts = [
+        request.build_absolute_uri(request.path),
+        query,
+        *get_versions(models),
+    ]
+    digest = hashlib.md5('\n'.join(parts).encode()).hexdigest()
+    return RESPONSE_KEY_TEMPLATE.format(digest=digest)
+
+
+def get_stats():
+    """Счётчики попаданий и промахов кэша в текущем процессе."""
+    with _stats_lock:
+        return {'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def count(event):
+    with _stats_lock:
+        _stats[event] += 1
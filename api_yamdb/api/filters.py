@@ -1,13 +1,98 @@
+from django.db.models import Count
 from django_filters import rest_framework as filters
 
 from reviews.models import Title
+from reviews.search import search_titles
+from users.models import User
+
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+GENRE_MODES = (
+    (GENRE_MODE_ANY, 'Любой из жанров'),
+    (GENRE_MODE_ALL, 'Все жанры'),
+)
 
 
 class TitleFilter(filters.FilterSet):
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODES, method='filter_genre_mode'
+    )
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    search = filters.CharFilter(method='filter_search')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating_min = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating_max = filters.NumberFilter(field_name='rating', lookup_expr='lte')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = (
+            'category', 'genre', 'genre_mode', 'name', 'year', 'search',
+            'year_min', 'year_max', 'rating_min', 'rating_max',
+        )
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__slug__in=_split_slugs(value))
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Произведения с любым (genre_mode=any) или со всеми жанрами.
+
+        Жанры проверяются подзапросом к промежуточной таблице, поэтому
+        строки произведений не дублируются и всё выполняется одним запросом.
+        """
+        slugs = set(_split_slugs(value))
+        title_ids = (
+            Title.genre.through.objects
+            .filter(genre__slug__in=slugs)
+            .values('title_id')
+        )
+        mode = self.form.cleaned_data.get('genre_mode') or GENRE_MODE_ANY
+        if mode == GENRE_MODE_ALL:
+            title_ids = (
+                title_ids
+                .annotate(genre_count=Count('genre_id'))
+                .filter(genre_count=len(slugs))
+                .values('title_id')
+            )
+        return queryset.filter(pk__in=title_ids)
+
+    def filter_genre_mode(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+class UserFilter(filters.FilterSet):
+    username_prefix = filters.CharFilter(method='filter_username_prefix')
+    email = filters.CharFilter(method='filter_email')
+
+    class Meta:
+        model = User
+        fields = ('username_prefix', 'email')
+
+    def filter_username_prefix(self, queryset, name, value):
+        """
+        Пользователи, чьё имя начинается с value без учёта регистра.
+
+        LIKE 'x%' индекс не использует, поэтому префикс задаётся
+        диапазоном по username_lower, а сортировка совпадает с индексом
+        (username_lower, id): запрос читает только первые строки диапазона.
+        """
+        prefix = value.lower()
+        return queryset.filter(
+            username_lower__gte=prefix,
+            username_lower__lt=prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        ).order_by('username_lower', 'pk')
+
+    def filter_email(self, queryset, name, value):
+        """Пользователь с адресом value без учёта регистра."""
+        # Индекс по email_lower упорядочен по id внутри одного адреса.
+        return queryset.filter(email_lower=value.lower()).order_by('pk')
+
+
+def _split_slugs(value):
+    return [slug.strip() for slug in value.split(',') if slug.strip()]
@@ -0,0 +1,56 @@
+"""
+Фоновые задачи API.
+
+Задачи выполняются по одной в потоке процесса: SQLite допускает только
+одного писателя, а порядок удалений так остаётся предсказуемым. Статус
+задачи хранится в кэше API, поэтому его видят все процессы с общим кэшем.
+"""
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+
+from api.cache import get_cache
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY_TEMPLATE = 'api-jobs:{job_id}'
+JOB_TIMEOUT = 24 * 60 * 60
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-jobs')
+
+
+def submit(func, *args):
+    """Ставит вызов func(*args) в очередь и возвращает id задачи."""
+    job_id = uuid.uuid4().hex
+    _set_status(job_id, PENDING)
+    _executor.submit(_run, job_id, func, args)
+    return job_id
+
+
+def get_status(job_id):
+    """Статус задачи или None, если задача неизвестна или устарела."""
+    return get_cache().get(JOB_KEY_TEMPLATE.format(job_id=job_id))
+
+
+def _set_status(job_id, status, result=None):
+    get_cache().set(
+        JOB_KEY_TEMPLATE.format(job_id=job_id),
+        {'id': job_id, 'status': status, 'result': result},
+        JOB_TIMEOUT
+    )
+
+
+def _run(job_id, func, args):
+    _set_status(job_id, RUNNING)
+    try:
+        result = func(*args)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась ошибкой', job_id)
+        _set_status(job_id, FAILED)
+    else:
+        _set_status(job_id, DONE, result)
+    finally:
+        connections.close_all()
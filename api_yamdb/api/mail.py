@@ -0,0 +1,201 @@
+"""
+Отправка писем через очередь в памяти процесса.
+
+send_mail кладёт письмо в ограниченную очередь и сразу возвращает
+управление. Потоки-обработчики забирают до EMAIL_BATCH_SIZE писем и
+отправляют их через одно соединение с почтовым бэкендом; неудачный пакет
+повторяется EMAIL_RETRIES раз с удваивающейся задержкой. Если очередь
+заполнена, send_mail ждёт место EMAIL_QUEUE_TIMEOUT секунд, а затем
+выбрасывает EmailQueueFull. Письма, не отправленные к остановке процесса,
+теряются, поэтому при выходе очередь досылается не дольше
+EMAIL_SHUTDOWN_TIMEOUT секунд.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_WORKERS = 2
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_QUEUE_TIMEOUT = 1
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_SHUTDOWN_TIMEOUT = 5
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+class EmailQueueFull(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Очередь писем переполнена, повторите запрос позже.'
+    default_code = 'email_queue_full'
+
+
+class EmailQueue:
+    """Ограниченная очередь писем с пулом потоков-обработчиков."""
+
+    def __init__(self, maxsize=DEFAULT_QUEUE_SIZE, workers=DEFAULT_WORKERS,
+                 batch_size=DEFAULT_BATCH_SIZE, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_RETRY_BACKOFF):
+        self.queue = queue.Queue(maxsize)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.threads = []
+        self.stats = Counter()
+        self.latency_max = 0
+        self.lock = threading.Lock()
+
+    def put(self, message, timeout=DEFAULT_QUEUE_TIMEOUT):
+        """Ставит письмо в очередь, ожидая места не дольше timeout."""
+        self.start()
+        try:
+            self.queue.put((time.monotonic(), message), timeout=timeout)
+        except queue.Full:
+            self.count('rejected')
+            raise EmailQueueFull
+        self.count('queued')
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self.run, name=f'email-queue-{number}', daemon=True
+                )
+                thread.start()
+                self.threads.append(thread)
+
+    def flush(self, timeout=None):
+        """Ждёт обработки всех писем; False, если не дождался."""
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(
+                lambda: not self.queue.unfinished_tasks, timeout
+            )
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.send(batch)
+            except Exception:
+                logger.exception('Ошибка обработки пакета писем')
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def send(self, batch):
+        messages = [message for _, message in batch]
+        for attempt in range(self.retries + 1):
+            try:
+                with get_connection(fail_silently=False) as connection:
+                    connection.send_messages(messages)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    logger.exception(
+                        'Не удалось отправить %d писем', len(messages)
+                    )
+                    self.count('failed', len(messages))
+                    return
+                # Повтор отправляет весь пакет: при обрыве посреди пакета
+                # часть писем может дойти дважды.
+                self.count('retried', len(messages))
+                time.sleep(self.backoff * 2 ** attempt)
+        now = time.monotonic()
+        latencies = [now - queued_at for queued_at, _ in batch]
+        with self.lock:
+            self.stats['sent'] += len(batch)
+            self.stats['batches'] += 1
+            self.stats['latency_total'] += sum(latencies)
+            self.latency_max = max(self.latency_max, *latencies)
+
+    def count(self, event, value=1):
+        with self.lock:
+            self.stats[event] += value
+
+    def get_stats(self):
+        """Глубина очереди, счётчики писем и задержка отправки в секундах."""
+        with self.lock:
+            sent = self.stats['sent']
+            return {
+                'depth': self.queue.qsize(),
+                'queued': self.stats['queued'],
+                'sent': sent,
+                'batches': self.stats['batches'],
+                'retried': self.stats['retried'],
+                'failed': self.stats['failed'],
+                'rejected': self.stats['rejected'],
+                'latency_avg': (
+                    self.stats['latency_total'] / sent if sent else 0
+                ),
+                'latency_max': self.latency_max,
+            }
+
+
+def get_queue():
+    """Очередь писем процесса, созданная по настройкам при первом вызове."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = EmailQueue(
+                maxsize=getattr(
+                    settings, 'EMAIL_QUEUE_SIZE', DEFAULT_QUEUE_SIZE
+                ),
+                workers=getattr(
+                    settings, 'EMAIL_QUEUE_WORKERS', DEFAULT_WORKERS
+                ),
+                batch_size=getattr(
+                    settings, 'EMAIL_BATCH_SIZE', DEFAULT_BATCH_SIZE
+                ),
+                retries=getattr(settings, 'EMAIL_RETRIES', DEFAULT_RETRIES),
+                backoff=getattr(
+                    settings, 'EMAIL_RETRY_BACKOFF', DEFAULT_RETRY_BACKOFF
+                ),
+            )
+            atexit.register(
+                _queue.flush,
+                getattr(
+                    settings, 'EMAIL_SHUTDOWN_TIMEOUT',
+                    DEFAULT_SHUTDOWN_TIMEOUT
+                )
+            )
+        return _queue
+
+
+def get_stats():
+    return get_queue().get_stats()
+
+
+def send_mail(subject, message, from_email, recipient_list):
+    """
+    Отправляет письмо через очередь.
+
+    С EMAIL_QUEUE_EAGER письмо отправляется сразу, как django send_mail.
+    """
+    email = EmailMessage(subject, message, from_email, recipient_list)
+    if getattr(settings, 'EMAIL_QUEUE_EAGER', False):
+        email.send(fail_silently=False)
+        return
+    get_queue().put(
+        email,
+        getattr(settings, 'EMAIL_QUEUE_TIMEOUT', DEFAULT_QUEUE_TIMEOUT)
+    )
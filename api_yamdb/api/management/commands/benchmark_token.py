@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import User
+
+BENCHMARK_USERNAME_TEMPLATE = 'benchmark_token_{number}'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark /auth/token/ on temporary users, rolled back afterwards'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=100)
+
+    def handle(self, *args, **options):
+        rates = {
+            scope: rate
+            for scope, rate in settings.REST_FRAMEWORK.get(
+                'DEFAULT_THROTTLE_RATES', {}
+            ).items()
+            if not scope.startswith('token.')
+        }
+        with override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates
+        }), transaction.atomic():
+            self.run(options['requests'], options['users'])
+            transaction.set_rollback(True)
+
+    def run(self, requests, users):
+        usernames = [
+            BENCHMARK_USERNAME_TEMPLATE.format(number=number)
+            for number in range(users)
+        ]
+        User.objects.bulk_create(
+            User(username=username, email=f'{username}@yamdb.fake')
+            for username in usernames
+        )
+        # bulk_create на SQLite не возвращает id, а он входит в код.
+        credentials = [
+            {
+                'username': user.username,
+                'confirmation_code': default_token_generator.make_token(user)
+            }
+            for user in User.objects.filter(username__in=usernames)
+        ]
+        client = Client()
+        url = reverse('api:token')
+        timings = []
+        with CaptureQueriesContext(connection) as context:
+            for number in range(requests):
+                data = credentials[number % len(credentials)]
+                started = time.perf_counter()
+                response = client.post(url, data=data)
+                timings.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    self.stderr.write(
+                        f'{url}: ответ {response.status_code}'
+                    )
+                    return
+        timings.sort()
+        self.stdout.write(
+            f'{requests} запросов к {url}: '
+            f'среднее {statistics.mean(timings) * 1000:.2f} мс, '
+            f'p50 {timings[len(timings) // 2] * 1000:.2f} мс, '
+            f'p95 {timings[int(len(timings) * 0.95)] * 1000:.2f} мс, '
+            f'{len(context.captured_queries) / requests:.1f} запросов к БД '
+            'на запрос'
+        )
@@ -0,0 +1,117 @@
+"""
+Поиск N+1 запросов во время обработки запросов к API.
+
+Запросы к БД группируются по отпечатку - SQL без значений параметров.
+Если запрос одной формы выполнился несколько раз за один HTTP-запрос,
+в лог пишется представление и поле сериализатора, которое его вызвало.
+Проверяется только доля запросов N_PLUS_ONE_SAMPLE_RATE, поэтому
+middleware можно включать и в продакшене.
+"""
+import logging
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 3
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+\b')
+PARAMS_LIST = re.compile(r'\((?:\s*%s\s*,)*\s*%s\s*\)')
+
+_reports = Counter()
+_reports_lock = threading.Lock()
+
+
+def get_fingerprint(sql):
+    """Приводит SQL к форме, не зависящей от значений параметров."""
+    sql = STRING_LITERAL.sub('%s', sql)
+    sql = NUMBER_LITERAL.sub('%s', sql)
+    return PARAMS_LIST.sub('(%s)', sql)
+
+
+def get_serializer_field():
+    """Поле сериализатора, во время представления которого идёт запрос."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        if frame.f_code.co_name == 'to_representation':
+            serializer = frame.f_locals.get('self')
+            field = frame.f_locals.get('field')
+            if isinstance(serializer, Serializer) and field is not None:
+                return f'{type(serializer).__name__}.{field.field_name}'
+        frame = frame.f_back
+    return None
+
+
+def get_reports():
+    """Найденные N+1 в текущем процессе: (view, поле, SQL) -> количество."""
+    with _reports_lock:
+        return dict(_reports)
+
+
+def clear_reports():
+    with _reports_lock:
+        _reports.clear()
+
+
+class QueryRecorder:
+    """Обёртка execute_wrapper, считающая запросы по отпечаткам и полям."""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.counts[(get_fingerprint(sql), get_serializer_field())] += 1
+        return execute(sql, params, many, context)
+
+
+class NPlusOneDetectorMiddleware:
+    """
+    Отмечает запросы к БД одной формы, повторённые в рамках HTTP-запроса.
+
+    Включается добавлением в MIDDLEWARE и ненулевым
+    N_PLUS_ONE_SAMPLE_RATE; повторы от N_PLUS_ONE_THRESHOLD раз пишутся
+    в лог api.middleware и в счётчики get_reports.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'N_PLUS_ONE_SAMPLE_RATE', 0)
+        self.threshold = getattr(
+            settings, 'N_PLUS_ONE_THRESHOLD', DEFAULT_THRESHOLD
+        )
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        recorder = QueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        self.report(request, recorder)
+        return response
+
+    def report(self, request, recorder):
+        match = request.resolver_match
+        view = match._func_path if match is not None else request.path
+        for (fingerprint, field), count in recorder.counts.items():
+            if count < self.threshold:
+                continue
+            with _reports_lock:
+                _reports[(view, field, fingerprint)] += count
+            logger.warning(
+                'N+1: %s %s (%s) выполнил %d запросов вида %s',
+                request.method, view, field or 'вне сериализатора',
+                count, fingerprint
+            )
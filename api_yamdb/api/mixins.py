@@ -0,0 +1,385 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from api import jobs
+from api.cache import CACHE_HEADER, count, get_cache, get_response_key
+from api.serializers import ExportParamsSerializer
+from reviews.export import (NDJSON_CONTENT_TYPE, get_export_queryset,
+                            iter_ndjson)
+
+FIELDS_QUERY_PARAM = 'fields'
+OMIT_QUERY_PARAM = 'omit'
+
+
+class ConditionalResponseMixin:
+    """
+    Отвечает 304 на условные GET-запросы до сериализации данных.
+
+    Валидаторы ответа возвращают get_etag и get_last_modified.
+    """
+
+    def get_etag(self, request):
+        return None
+
+    def get_last_modified(self, request):
+        return None
+
+    def get_response(self, handler, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def get_validated_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        last_modified = self.get_last_modified(request)
+        if etag is not None:
+            etag = quote_etag(etag)
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        response = self.get_response(handler, request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            if etag is not None:
+                response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ModifiedQuerysetMixin(ConditionalResponseMixin):
+    """
+    Валидаторы ответа без загрузки данных.
+
+    Отдельный объект получает ETag и Last-Modified по полю modified_field
+    одним запросом к его записи. ETag списка собирается из версий моделей
+    version_models в кэше API, как ключ CachedResponseMixin: он не
+    требует запросов к БД и меняется при записи любой из этих моделей,
+    в том числе при переименовании автора. Last-Modified список не
+    отдаёт: удаление записи не меняет максимальную дату остальных.
+    """
+
+    modified_field = 'updated'
+    version_models = ()
+
+    def is_detail(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return lookup_url_kwarg in self.kwargs
+
+    def get_modified_state(self):
+        if not hasattr(self, '_modified_state'):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = self.filter_queryset(self.get_queryset()).filter(**{
+                self.lookup_field: self.kwargs[lookup_url_kwarg]
+            })
+            self._modified_state = queryset.aggregate(
+                last_modified=Max(self.modified_field),
+                count=Count('pk'),
+            )
+        return self._modified_state
+
+    def get_etag(self, request):
+        if not self.is_detail():
+            return get_response_key(
+                request, self.version_models
+            ).rpartition(':')[2]
+        state = self.get_modified_state()
+        if state['last_modified'] is None:
+            return None
+        validator = '\n'.join((
+            request.get_full_path(),
+            str(state['count']),
+            state['last_modified'].isoformat(),
+        ))
+        return hashlib.md5(validator.encode()).hexdigest()
+
+    def get_last_modified(self, request):
+        if not self.is_detail():
+            return None
+        return self.get_modified_state()['last_modified']
+
+
+class CachedResponseMixin(ConditionalResponseMixin):
+    """
+    Кэширует данные успешных ответов на GET-запросы.
+
+    Модели, от которых зависит ответ, перечисляются в cache_models;
+    ключ кэша служит и ETag ответа, так что 304 отдаётся без запросов к БД.
+    """
+
+    cache_models = ()
+
+    def get_cache_models(self):
+        return self.cache_models
+
+    def get_response_key(self, request):
+        if not hasattr(self, '_response_key'):
+            self._response_key = get_response_key(
+                request, self.get_cache_models()
+            )
+        return self._response_key
+
+    def get_etag(self, request):
+        return self.get_response_key(request).rpartition(':')[2]
+
+    def get_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_response_key(request)
+        data = cache.get(key)
+        if data is not None:
+            count('hits')
+            response = Response(data, status=status.HTTP_200_OK)
+            response[CACHE_HEADER] = 'HIT'
+            return response
+        count('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                response.data,
+                getattr(settings, 'API_CACHE_TIMEOUT', None)
+            )
+        response[CACHE_HEADER] = 'MISS'
+        return response
+
+
+class ValidatedListModelMixin:
+
+    def list(self, request, *args, **kwargs):
+        return self.get_validated_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ValidatedRetrieveModelMixin:
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_validated_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class CachedListModelMixin(CachedResponseMixin, ValidatedListModelMixin):
+    pass
+
+
+class CachedRetrieveModelMixin(CachedResponseMixin,
+                               ValidatedRetrieveModelMixin):
+    pass
+
+
+class ModifiedListModelMixin(ModifiedQuerysetMixin, ValidatedListModelMixin):
+    pass
+
+
+class ModifiedRetrieveModelMixin(ModifiedQuerysetMixin,
+                                 ValidatedRetrieveModelMixin):
+    pass
+
+
+class NestedParentMixin:
+    """
+    Вложенный ресурс, родитель которого задан параметрами URL.
+
+    Объекты фильтруются по child_lookups без загрузки родителя, а его
+    существование проверяется одним запросом по parent_lookups только при
+    создании объекта или пустой странице списка; результат запоминается.
+    """
+
+    parent_model = None
+    parent_lookups = {}
+    child_lookups = {}
+
+    def get_url_ids(self, lookups):
+        try:
+            return {
+                field: int(self.kwargs[kwarg])
+                for field, kwarg in lookups.items()
+            }
+        except (KeyError, ValueError):
+            raise Http404
+
+    def check_parent_exists(self):
+        if not hasattr(self, '_parent_exists'):
+            self._parent_exists = self.parent_model.objects.filter(
+                **self.get_url_ids(self.parent_lookups)
+            ).exists()
+        if not self._parent_exists:
+            raise Http404
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            **self.get_url_ids(self.child_lookups)
+        )
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.check_parent_exists()
+        return page
+
+
+class ExportMixin:
+    """
+    Потоковая выгрузка queryset представления в NDJSON.
+
+    Фильтры и пагинация представления не применяются; параметр since
+    ограничивает выгрузку записями, опубликованными не раньше него.
+    Выгрузка троттлится в области export_throttle_scope.
+    """
+
+    export_throttle_scope = 'export'
+
+    def get_export_response(self, request):
+        serializer = ExportParamsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        queryset = get_export_queryset(
+            self.get_queryset(), **serializer.validated_data
+        )
+        return StreamingHttpResponse(
+            iter_ndjson(queryset), content_type=NDJSON_CONTENT_TYPE
+        )
+
+
+class ExportListModelMixin(ExportMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.get_export_response(request)
+
+
+class BulkDestroyModelMixin:
+    """
+    Удаление объекта вместе с зависимыми записями пакетными DELETE.
+
+    Небольшой каскад (не больше BULK_DELETE_SYNC_LIMIT записей) удаляется
+    сразу с ответом 204, большой - фоновой задачей: ответ 202 содержит
+    ссылку на её статус.
+    """
+
+    bulk_delete = None
+    get_cascade_size = None
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        limit = getattr(settings, 'BULK_DELETE_SYNC_LIMIT', 0)
+        if self.get_cascade_size(instance.pk) <= limit:
+            self.bulk_delete(instance.pk)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        job_id = jobs.submit(self.bulk_delete, instance.pk)
+        url = reverse('api:jobs-detail', args=[job_id], request=request)
+        return Response(
+            {'id': job_id, 'status': jobs.PENDING, 'url': url},
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': url}
+        )
+
+
+class SparseFieldsMixin:
+    """
+    Поля ответа на GET-запрос по параметрам ?fields= и ?omit=.
+
+    Выбранные поля передаются сериализатору в контексте, а queryset
+    сужается через only() до колонок этих полей. Поле сериализатора
+    берётся из одноимённого поля модели или из sparse_field_sources;
+    связи через __ добавляются в select_related, остальные связи
+    queryset сбрасываются.
+    """
+
+    sparse_field_sources = {}
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        params = self.request.query_params
+        if self.request.method not in SAFE_METHODS or not (
+            FIELDS_QUERY_PARAM in params or OMIT_QUERY_PARAM in params
+        ):
+            return None
+        serializer_class = self.get_serializer_class()
+        available = getattr(serializer_class, 'field_names', None)
+        if available is None:
+            available = serializer_class.Meta.fields
+        fields = _split(params.get(FIELDS_QUERY_PARAM)) or available
+        omit = _split(params.get(OMIT_QUERY_PARAM))
+        unknown = (set(fields) | set(omit)) - set(available)
+        if unknown:
+            raise ValidationError({
+                FIELDS_QUERY_PARAM: [
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        return [
+            name for name in available if name in fields and name not in omit
+        ]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields()
+        if fields is None or queryset._fields is not None:
+            return queryset
+        only = self.get_only_fields(queryset.model, fields)
+        related = {
+            field.rpartition('__')[0] for field in only if '__' in field
+        }
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*only)
+
+    def get_only_fields(self, model, fields):
+        only = [model._meta.pk.name]
+        only.extend(field.lstrip('-') for field in model._meta.ordering)
+        for name in fields:
+            if name in self.sparse_field_sources:
+                only.extend(self.sparse_field_sources[name])
+                continue
+            try:
+                only.append(model._meta.get_field(name).name)
+            except FieldDoesNotExist:
+                continue
+        return only
+
+
+class WriteThrottleMixin:
+    """
+    Троттлинг изменяющих запросов в области write_throttle_scope.
+
+    Безопасные запросы не троттлятся, кроме действия export: оно
+    троттлится в области export_throttle_scope.
+    """
+
+    write_throttle_scope = None
+
+    @property
+    def throttle_scope(self):
+        if self.action == 'export':
+            return self.export_throttle_scope
+        if self.request.method in SAFE_METHODS:
+            return None
+        return self.write_throttle_scope
+
+
+def _split(value):
+    if not value:
+        return []
+    return [name.strip() for name in value.split(',') if name.strip()]
@@ -0,0 +1,172 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       LimitOffsetPagination)
+
+PAGINATION_QUERY_PARAM = 'pagination'
+CURSOR_PAGINATION_MODE = 'cursor'
+POSITION_SEPARATOR = '|'
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Курсорная пагинация по паре (поле сортировки, pk).
+
+    Сортировка по нескольким полям в этом режиме отклоняется с ответом 400.
+
+    В отличие от CursorPagination, курсор хранит не смещение внутри
+    одинаковых значений, а pk последней записи, поэтому любая страница
+    выбирается одним запросом по индексу без OFFSET и COUNT(*).
+    """
+
+    ordering = None
+    page_size_query_param = 'limit'
+    max_page_size = 1000
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        ordering_filters = [
+            filter_cls for filter_cls in getattr(view, 'filter_backends', [])
+            if hasattr(filter_cls, 'get_ordering')
+        ]
+        if ordering_filters:
+            ordering = ordering_filters[0]().get_ordering(
+                request, queryset, view
+            )
+        if ordering and len(ordering) > 1:
+            raise ParseError(
+                'Курсорная пагинация поддерживает сортировку только '
+                'по одному полю.'
+            )
+        ordering = (
+            ordering and ordering[0]
+            or getattr(view, 'cursor_ordering', None)
+            or queryset.model._meta.ordering[0]
+        )
+        if queryset.model._meta.get_field(ordering.lstrip('-')).null:
+            raise ParseError(
+                f'Курсорная пагинация не поддерживает сортировку '
+                f'по полю {ordering.lstrip("-")}.'
+            )
+        descending = ordering.startswith('-')
+        return ordering, '-pk' if descending else 'pk'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            reverse, position = False, None
+        else:
+            _, reverse, position = self.cursor
+
+        if reverse:
+            queryset = queryset.order_by(
+                *(_invert(field) for field in self.ordering)
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        try:
+            if position is not None:
+                queryset = queryset.filter(self._get_keyset_filter(
+                    position, reverse
+                ))
+            results = list(queryset[:self.page_size + 1])
+        except (ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        if self.page:
+            self.next_position = self._get_position_from_instance(
+                self.page[-1], self.ordering
+            )
+            self.previous_position = self._get_position_from_instance(
+                self.page[0], self.ordering
+            )
+        else:
+            self.next_position = self.previous_position = position
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self.next_position)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self.previous_position)
+        )
+
+    def _get_keyset_filter(self, position, reverse):
+        value, separator, pk = position.rpartition(POSITION_SEPARATOR)
+        if not separator or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        field = self.ordering[0]
+        descending = field.startswith('-') != reverse
+        lookup = 'lt' if descending else 'gt'
+        field = field.lstrip('-')
+        return (
+            Q(**{f'{field}__{lookup}': value})
+            | Q(**{field: value, f'pk__{lookup}': int(pk)})
+        )
+
+    def _get_position_from_instance(self, instance, ordering):
+        value = super()._get_position_from_instance(instance, ordering)
+        if isinstance(instance, dict):
+            pk = instance['id']
+        else:
+            pk = instance.pk
+        return f'{value}{POSITION_SEPARATOR}{pk}'
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """
+    Пагинация limit/offset с опциональным курсорным режимом.
+
+    Курсорный режим включается параметром ?pagination=cursor или наличием
+    параметра cursor; ответ в этом режиме не содержит ключа count.
+    """
+
+    cursor_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        query_params = request.query_params
+        if (
+            query_params.get(PAGINATION_QUERY_PARAM) == CURSOR_PAGINATION_MODE
+            or self.cursor_pagination_class.cursor_query_param in query_params
+        ):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+def _invert(ordering):
+    if ordering.startswith('-'):
+        return ordering[1:]
+    return f'-{ordering}'
@@ -1,18 +1,54 @@
+import re
+from collections import defaultdict
+from operator import attrgetter
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.forms import ValidationError
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
+from api.authentication import CLAIMS
+from api.cache import bump_version
+from api.fields import BulkSlugRelatedField
+from api.mail import send_mail
+from reviews.constants import MAX_SCORE, MIN_SCORE
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.constsans import MAX_EMAIL_LENGTH, MAX_USERNAME_LENGTH
 from users.models import User
 from users.validators import validate_username_uniqueness
 
+MAX_HISTOGRAM_IDS = 100
+DUPLICATE_REVIEW_MESSAGE = 'Нельзя сделать 2 отзыва на одно произведение!'
+MAX_BATCH_REVIEWS = 10000
+BATCH_CHUNK_SIZE = 500
+INCLUDE_REVIEWS_PATTERN = re.compile(r'reviews(?:\[:(\d+)\])?')
+# Поля для default_token_generator.check_token и ClaimsAccessToken.
+TOKEN_USER_FIELDS = ('id', 'password', 'last_login', 'email', *CLAIMS)
+DEFAULT_INCLUDED_REVIEWS = 5
+MAX_INCLUDED_REVIEWS = 20
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Оставляет в ответе только поля из контекста под ключом fields.
+
+    Действует на сериализатор верхнего уровня или элемент списка, но не на
+    вложенные сериализаторы.
+    """
 
-class CategorySerializer(serializers.ModelSerializer):
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        if selected is None or self.field_name:
+            return fields
+        return {name: fields[name] for name in selected}
+
+
+class CategorySerializer(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор для модели Category."""
 
     class Meta:
@@ -21,7 +57,8 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериализатор для модели Genre."""
 
     class Meta:
@@ -50,16 +87,120 @@ class ReadTitleSerializer(AbstractTitleSerializer):
     """Сериализатор объектов класса Title при GET запросах."""
 
     category = CategorySerializer()
-    genre = GenreSerializer(many=True)
+    genre = serializers.SerializerMethodField()
 
     class Meta(AbstractTitleSerializer.Meta):
         pass
 
+    def get_genre(self, title):
+        # Жанры, уже загруженные вызывающим кодом, передаются в контексте.
+        genres = self.context.get('genres')
+        if genres is None:
+            genres = title.genre.all()
+        return GenreSerializer(genres, many=True).data
+
+
+class ProjectedTitleListSerializer(serializers.ListSerializer):
+
+    def to_representation(self, data):
+        return self.child.represent(list(data))
+
+
+class ProjectedTitleSerializer(serializers.BaseSerializer):
+    """
+    Сериализатор произведений из словарей QuerySet.values().
+
+    Выдаёт тот же результат, что и ReadTitleSerializer, но без создания
+    моделей и полей DRF: жанры всей страницы загружаются одним запросом.
+    """
+
+    # Поле ответа -> колонки values(), из которых оно собирается.
+    field_values = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category__name', 'category__slug'),
+    }
+    # Колонки сортировки и курсорной пагинации выбираются всегда.
+    base_values = ('id', 'name', 'year', 'rating', 'created')
+    field_names = tuple(field_values)
+
+    class Meta:
+        list_serializer_class = ProjectedTitleListSerializer
+
+    @classmethod
+    def get_values_fields(cls, fields=None):
+        """Колонки values(), нужные для выбранных полей ответа."""
+        values = list(cls.base_values)
+        for field in cls.field_names if fields is None else fields:
+            values.extend(
+                value for value in cls.field_values[field]
+                if value not in values
+            )
+        return values
+
+    def to_representation(self, instance):
+        return self.represent([instance])[0]
+
+    def represent(self, rows):
+        fields = self.context.get('fields')
+        if fields is None:
+            fields = self.field_names
+        genres = defaultdict(list)
+        if 'genre' in fields:
+            for title_id, name, slug in Genre.objects.filter(
+                titles__in=[row['id'] for row in rows]
+            ).values_list('titles', 'name', 'slug'):
+                genres[title_id].append({'name': name, 'slug': slug})
+        result = [
+            {
+                field: self.represent_field(field, row, genres)
+                for field in fields
+            }
+            for row in rows
+        ]
+        limit = self.context.get('include_reviews')
+        if limit and rows:
+            reviews = self.get_included_reviews(rows, limit)
+            for row, item in zip(rows, result):
+                item['reviews'] = reviews[row['id']]
+        return result
+
+    def get_included_reviews(self, rows, limit):
+        """Последние отзывы на произведения страницы одним запросом."""
+        reviews = sorted(
+            Review.objects.latest_per_title(
+                [row['id'] for row in rows], limit
+            ).select_related('author').order_by(),
+            key=attrgetter('pub_date', 'pk'),
+            reverse=True
+        )
+        result = defaultdict(list)
+        data = ReviewSerializer(reviews, many=True).data
+        for review, item in zip(reviews, data):
+            result[review.title_id].append(item)
+        return result
+
+    def represent_field(self, field, row, genres):
+        if field == 'genre':
+            return genres[row['id']]
+        if field == 'category':
+            if row['category__slug'] is None:
+                return None
+            return {
+                'name': row['category__name'],
+                'slug': row['category__slug'],
+            }
+        return row[field]
+
 
 class WriteTitleSerializer(AbstractTitleSerializer):
     """Сериализатор объектов класса Title при небезопасных запросах."""
 
-    genre = serializers.SlugRelatedField(
+    genre = BulkSlugRelatedField(
         slug_field='slug', many=True, queryset=Genre.objects.all()
     )
     category = serializers.SlugRelatedField(
@@ -69,11 +210,87 @@ class WriteTitleSerializer(AbstractTitleSerializer):
     class Meta(AbstractTitleSerializer.Meta):
         pass
 
+    def create(self, validated_data):
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = Title.objects.create(**validated_data)
+            title.set_genres(genres, created=True)
+        return title
+
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if genres is not None:
+                instance.set_genres(genres)
+        return instance
+
+    def to_representation(self, instance):
+        context = dict(self.context)
+        if hasattr(self, 'initial_data'):
+            genres = self.validated_data.get('genre')
+            if genres is not None:
+                # Жанры уже загружены при валидации, поэтому ответ
+                # собирается без повторного запроса к промежуточной таблице.
+                context['genres'] = sorted(
+                    set(genres), key=attrgetter('name')
+                )
+        return ReadTitleSerializer(instance, context=context).data
+
+
+class ScoreHistogramSerializer(serializers.Serializer):
+    """Распределение оценок произведения из пары (title_id, histogram)."""
+
     def to_representation(self, instance):
-        return ReadTitleSerializer(instance).data
+        title_id, histogram = instance
+        return {'id': title_id, 'histogram': histogram}
+
+
+class IncludeSerializer(serializers.Serializer):
+    """Связанные объекты, встраиваемые в ответ: ?include=reviews[:N]."""
+
+    include = serializers.CharField(required=False)
+
+    def validate_include(self, value):
+        match = INCLUDE_REVIEWS_PATTERN.fullmatch(value)
+        if match is None:
+            raise ValidationError(
+                'Поддерживается только include=reviews или reviews[:N].'
+            )
+        limit = int(match[1] or DEFAULT_INCLUDED_REVIEWS)
+        if not 0 < limit <= MAX_INCLUDED_REVIEWS:
+            raise ValidationError(
+                f'Можно встроить от 1 до {MAX_INCLUDED_REVIEWS} отзывов.'
+            )
+        return limit
+
+
+class TitleIdsSerializer(serializers.Serializer):
+    """Список id произведений для пакетного запроса распределений."""
+
+    ids = serializers.CharField(required=True)
+
+    def validate_ids(self, value):
+        try:
+            ids = {int(title_id) for title_id in value.split(',')}
+        except ValueError:
+            raise ValidationError('Передайте id произведений через запятую.')
+        if len(ids) > MAX_HISTOGRAM_IDS:
+            raise ValidationError(
+                f'За один запрос можно получить не более '
+                f'{MAX_HISTOGRAM_IDS} распределений.'
+            )
+        return ids
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    """Параметры потоковой выгрузки."""
+
+    since = serializers.DateTimeField(required=False)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериализатор для модели Review."""
 
     author = serializers.SlugRelatedField(
@@ -83,24 +300,39 @@ class ReviewSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id', 'text', 'author', 'score', 'pub_date',
+            'comments_count', 'last_comment_at',
+        )
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method != 'POST':
-            return data
-        title_id = self.context['view'].kwargs.get('title_id')
-        if Review.objects.filter(
-            author=request.user,
-            title_id=title_id
-        ).exists():
-            raise ValidationError(
-                'Нельзя сделать 2 отзыва на одно произведение!'
-            )
-        return data
+    def create(self, validated_data):
+        # Повторный отзыв ловит ограничение unique_author_title, а не
+        # предварительный запрос: проверка и вставка не могут разойтись.
+        # Другие нарушения целостности, например удалённый автор,
+        # пробрасываются дальше.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author_id=validated_data['author_id'],
+                title_id=validated_data['title_id']
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_MESSAGE]
+            })
+
+    def upsert(self, author_id, title_id):
+        """Создаёт или заменяет отзыв автора на произведение."""
+        return Review.objects.update_or_create(
+            author_id=author_id,
+            title_id=title_id,
+            defaults=self.validated_data
+        )
 
 
-class CommentSerializers(serializers.ModelSerializer):
+class CommentSerializers(SparseFieldsSerializerMixin,
+                         serializers.ModelSerializer):
     """Сериализатор объектов класса Comment."""
 
     author = serializers.SlugRelatedField(
@@ -112,6 +344,146 @@ class CommentSerializers(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
+class ReviewBatchItemSerializer(serializers.Serializer):
+    """Отзыв из пакетной загрузки."""
+
+    title = serializers.IntegerField(min_value=1)
+    author = serializers.CharField(max_length=MAX_USERNAME_LENGTH)
+    text = serializers.CharField()
+    score = serializers.IntegerField(min_value=MIN_SCORE, max_value=MAX_SCORE)
+
+
+class ReviewBatchSerializer(serializers.BaseSerializer):
+    """
+    Пакет отзывов на разные произведения.
+
+    Поля проверяются по каждому отзыву, а существование произведений,
+    авторов и повторы отзывов - несколькими запросами на весь пакет.
+    Ошибки возвращаются списком по отзывам, как у many=True; при любой
+    ошибке не сохраняется ни один отзыв.
+    """
+
+    default_error_messages = {
+        'not_a_list': 'Ожидался список отзывов.',
+        'empty': 'Список отзывов не может быть пустым.',
+        'max_length': 'В пакете не может быть больше {max_length} отзывов.',
+        'no_title': 'Произведение не найдено.',
+        'no_author': 'Пользователь не найден.',
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            self.fail('not_a_list')
+        if not data:
+            self.fail('empty')
+        if len(data) > MAX_BATCH_REVIEWS:
+            self.fail('max_length', max_length=MAX_BATCH_REVIEWS)
+        items, errors = self.validate_items(data)
+        reviews = self.build_reviews(items, errors)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return {'reviews': reviews}
+
+    def validate_items(self, data):
+        child = ReviewBatchItemSerializer()
+        items, errors = [], []
+        for item in data:
+            try:
+                items.append(child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        return items, errors
+
+    def build_reviews(self, items, errors):
+        valid = [item for item in items if item is not None]
+        title_ids = self.get_existing_titles({item['title'] for item in valid})
+        author_ids = self.get_authors({item['author'] for item in valid})
+        reviewed = self.get_reviewed(title_ids, set(author_ids.values()))
+        reviews = []
+        for item, item_errors in zip(items, errors):
+            if item is None:
+                continue
+            if item['title'] not in title_ids:
+                item_errors['title'] = [self.error_messages['no_title']]
+            author_id = author_ids.get(item['author'])
+            if author_id is None:
+                item_errors['author'] = [self.error_messages['no_author']]
+            elif (item['title'], author_id) in reviewed:
+                item_errors[api_settings.NON_FIELD_ERRORS_KEY] = [
+                    DUPLICATE_REVIEW_MESSAGE
+                ]
+            if item_errors:
+                continue
+            reviewed.add((item['title'], author_id))
+            reviews.append(Review(
+                title_id=item['title'],
+                author_id=author_id,
+                text=item['text'],
+                score=item['score'],
+            ))
+        return reviews
+
+    def get_existing_titles(self, title_ids):
+        return {
+            pk
+            for chunk in _chunked(title_ids, BATCH_CHUNK_SIZE)
+            for pk in Title.objects.filter(pk__in=chunk).values_list(
+                'pk', flat=True
+            )
+        }
+
+    def get_authors(self, usernames):
+        return {
+            username: pk
+            for chunk in _chunked(usernames, BATCH_CHUNK_SIZE)
+            for username, pk in User.objects.filter(
+                username__in=chunk
+            ).values_list('username', 'pk')
+        }
+
+    def get_reviewed(self, title_ids, author_ids):
+        # Только пары авторов пакета: у популярных произведений отзывов
+        # других авторов может быть намного больше, чем в самом пакете.
+        return {
+            pair
+            for title_chunk in _chunked(title_ids, BATCH_CHUNK_SIZE)
+            for author_chunk in _chunked(author_ids, BATCH_CHUNK_SIZE)
+            for pair in Review.objects.filter(
+                title_id__in=title_chunk, author_id__in=author_chunk
+            ).values_list('title_id', 'author_id')
+        }
+
+    def create(self, validated_data):
+        reviews = validated_data['reviews']
+        title_ids = {review.title_id for review in reviews}
+        # bulk_create не отправляет сигналы, поэтому рейтинг и кэш
+        # обновляются один раз на пакет.
+        with transaction.atomic():
+            try:
+                Review.objects.bulk_create(
+                    reviews, batch_size=BATCH_CHUNK_SIZE
+                )
+            except IntegrityError:
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        DUPLICATE_REVIEW_MESSAGE
+                    ]
+                })
+            for chunk in _chunked(title_ids, BATCH_CHUNK_SIZE):
+                Title.objects.filter(pk__in=chunk).recount_scores()
+            transaction.on_commit(lambda: bump_version(Review))
+            transaction.on_commit(lambda: bump_version(Title))
+        return reviews
+
+    def to_representation(self, instance):
+        return {
+            'created': len(instance),
+            'titles': sorted({review.title_id for review in instance}),
+        }
+
+
 class UserCreateSerializer(serializers.Serializer):
     """Базовый сериализатор для валидации полей username и email."""
 
@@ -131,7 +503,6 @@ class UserCreateSerializer(serializers.Serializer):
                 f'Код подтверждения: {confirmation_code}',
                 settings.DEFAULT_FROM_EMAIL,
                 [validated_data['email']],
-                fail_silently=False,
             )
             return user
         except IntegrityError as e:
@@ -142,7 +513,8 @@ class UserCreateSerializer(serializers.Serializer):
         fields = ('username', 'email',)
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsSerializerMixin,
+                     serializers.ModelSerializer):
     """Сериализатор для пользователей."""
 
     class Meta:
@@ -171,11 +543,18 @@ class TokenSerializer(serializers.Serializer):
     def validate(self, data):
         """
         Проверка confirmation_code.
+
+        Пользователь загружается один раз и только с полями, нужными для
+        проверки кода и выдачи токена, и возвращается в data['user'].
         """
-        user = get_object_or_404(User, username=data['username'])
+        user = get_object_or_404(
+            User.objects.only(*TOKEN_USER_FIELDS),
+            username=data['username']
+        )
         confirmation_code = data['confirmation_code']
         if not default_token_generator.check_token(user, confirmation_code):
             raise ValidationError('Неверный код подтверждения')
+        data['user'] = user
         return data
 
 
@@ -186,3 +565,9 @@ class MeSerializer(UserSerializer):
         """Мета класс пользователя."""
 
         read_only_fields = ('role',)
+
+
+def _chunked(values, size):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
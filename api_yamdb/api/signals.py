@@ -0,0 +1,51 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import CLAIMS, remember_user_claims
+from api.cache import bump_version
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=User)
+def bump_cache_version(sender, **kwargs):
+    """Сбрасывает кэш ответов, зависящих от изменённой модели."""
+    # Версия меняется после коммита, иначе конкурентный запрос успеет
+    # закэшировать старые данные уже под новой версией.
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_cache_version_on_genre_change(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(lambda: bump_version(Title))
+
+
+@receiver(post_save, sender=User)
+def remember_claims(sender, instance, **kwargs):
+    """Уже выданные токены получат новые роль и флаги пользователя."""
+    user_id = instance.pk
+    claims = {claim: getattr(instance, claim) for claim in CLAIMS}
+    transaction.on_commit(lambda: remember_user_claims(user_id, claims))
+
+
+@receiver(post_delete, sender=User)
+def deactivate_claims(sender, instance, **kwargs):
+    """Токены удалённого пользователя больше не принимаются."""
+    # После удаления Collector обнуляет pk, поэтому он запоминается сразу.
+    user_id = instance.pk
+    claims = {claim: getattr(instance, claim) for claim in CLAIMS}
+    claims['is_active'] = False
+    transaction.on_commit(lambda: remember_user_claims(user_id, claims))
@@ -0,0 +1,133 @@
+"""
+Троттлинг запросов по скользящему окну.
+
+Область троттлинга задаётся атрибутом throttle_scope представления, для
+функций-представлений - декоратором throttle_scope. Скорость для области
+берётся из REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] по ключам
+'<область>.ip' и '<область>.user' в формате DRF ('5/min').
+
+Запросы считаются в окнах длиной в период скорости атомарными
+cache.add и cache.incr, поэтому счётчики в кэше API общие для всех
+процессов и параллельные запросы не проходят сверх лимита. Число запросов
+за последний период оценивается как счётчик текущего окна плюс доля
+предыдущего, ещё попадающая в период: это приближение считает запросы
+предыдущего окна равномерно распределёнными по нему.
+"""
+import math
+import time
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from api.cache import get_cache
+
+WINDOW_KEY_TEMPLATE = 'throttle:{kind}:{scope}:{ident}:{window}'
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def throttle_scope(scope):
+    """
+    Задаёт область троттлинга функции-представлению.
+
+    Ставится над декоратором api_view.
+    """
+    def decorator(view):
+        view.cls.throttle_scope = scope
+        return view
+    return decorator
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60): число запросов и период в секундах."""
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Счётчик на область и идентификатор клиента из get_ident_key."""
+
+    kind = None
+    timer = time.time
+
+    def get_ident_key(self, request):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return None, None
+        return scope, api_settings.DEFAULT_THROTTLE_RATES.get(
+            f'{scope}.{self.kind}'
+        )
+
+    def allow_request(self, request, view):
+        scope, rate = self.get_rate(view)
+        if rate is None:
+            return True
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+        limit, duration = parse_rate(rate)
+        now = self.timer()
+        window, elapsed = divmod(now, duration)
+        keys = [
+            WINDOW_KEY_TEMPLATE.format(
+                kind=self.kind, scope=scope, ident=ident, window=int(number)
+            )
+            for number in (window, window - 1)
+        ]
+        cache = get_cache()
+        count = self.increment(cache, keys[0], duration)
+        previous = cache.get(keys[1], 0)
+        weight = 1 - elapsed / duration
+        if previous * weight + count <= limit:
+            return True
+        # Отклонённый запрос не должен занимать место в окне.
+        cache.decr(keys[0])
+        self.retry_after = self.get_retry_after(
+            limit, duration, elapsed, previous, count - 1
+        )
+        return False
+
+    def increment(self, cache, key, duration):
+        # Окно хранится два периода: следующее окно читает его как
+        # предыдущее.
+        cache.add(key, 0, duration * 2)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Ключ вытеснен между add и incr.
+            cache.add(key, 0, duration * 2)
+            return cache.incr(key)
+
+    def get_retry_after(self, limit, duration, elapsed, previous, count):
+        """Секунды до момента, когда оценка окна позволит ещё запрос."""
+        if count < limit:
+            # Хватит, когда доля предыдущего окна уменьшится.
+            return duration * (1 - (limit - count - 1) / previous) - elapsed
+        # Текущее окно заполнено: ждём, пока оно станет предыдущим и
+        # его доля уменьшится.
+        return duration - elapsed + duration * (1 - (limit - 1) / count)
+
+    def wait(self):
+        return max(math.ceil(self.retry_after), 0)
+
+
+class IPSlidingWindowThrottle(SlidingWindowThrottle):
+    """Счётчик на IP-адрес клиента."""
+
+    kind = 'ip'
+
+    def get_ident_key(self, request):
+        return self.get_ident(request)
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """Счётчик на аутентифицированного пользователя."""
+
+    kind = 'user'
+
+    def get_ident_key(self, request):
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return request.user.pk
@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework import routers
 
-from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
+from api.views import (CategoryViewSet, CommentExportViewSet, CommentViewSet,
+                       GenreViewSet, JobViewSet, ReviewExportViewSet,
                        ReviewViewSet, TitleViewSet, UserViewSet,
-                       send_confirmation_code, send_token)
+                       batch_reviews, send_confirmation_code, send_token)
 
 app_name = 'api'
 
@@ -33,6 +34,21 @@ v1_router.register(
     CommentViewSet,
     basename='comments'
 )
+v1_router.register(
+    'reviews/export',
+    ReviewExportViewSet,
+    basename='reviews-export'
+)
+v1_router.register(
+    'comments/export',
+    CommentExportViewSet,
+    basename='comments-export'
+)
+v1_router.register(
+    'jobs',
+    JobViewSet,
+    basename='jobs'
+)
 v1_router.register(
     'users',
     UserViewSet,
@@ -53,6 +69,7 @@ auth_urls = [
 
 
 urlpatterns = [
+    path('v1/reviews/batch/', batch_reviews, name='reviews-batch'),
     path('v1/', include(v1_router.urls)),
     path('v1/auth/', include(auth_urls)),
 ]
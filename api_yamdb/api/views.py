@@ -1,21 +1,34 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.http import Http404
 from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
 
-from api.filters import TitleFilter
+from api import jobs
+from api.authentication import ClaimsAccessToken
+from api.filters import TitleFilter, UserFilter
+from api.mixins import (BulkDestroyModelMixin, CachedListModelMixin,
+                        CachedRetrieveModelMixin, ExportMixin,
+                        ModifiedListModelMixin, ModifiedRetrieveModelMixin,
+                        NestedParentMixin, SparseFieldsMixin,
+                        WriteThrottleMixin)
 from api.permission import AdminOrReadOnly, IsAdmin, IsOwnerOrAdminOrModerator
 from api.serializers import (CategorySerializer, CommentSerializers,
-                             GenreSerializer, MeSerializer,
-                             ReadTitleSerializer, ReviewSerializer,
-                             TokenSerializer, UserCreateSerializer,
-                             UserSerializer, WriteTitleSerializer)
-from api.viewsets import CategoryGenreViewSet
-from reviews.models import Category, Comment, Genre, Review, Title
+                             GenreSerializer, IncludeSerializer, MeSerializer,
+                             ProjectedTitleSerializer, ReviewBatchSerializer,
+                             ReviewSerializer, ScoreHistogramSerializer,
+                             TitleIdsSerializer, TokenSerializer,
+                             UserCreateSerializer, UserSerializer,
+                             WriteTitleSerializer)
+from api.throttling import throttle_scope
+from api.viewsets import CategoryGenreViewSet, ExportViewSet
+from reviews.deletion import (delete_review, delete_title, delete_user,
+                              get_title_cascade_size, get_user_cascade_size)
+from reviews.models import (Category, Comment, Genre, Review, ScoreBucket,
+                            Title)
 
 User = get_user_model()
 
@@ -23,73 +36,223 @@ User = get_user_model()
 class CategoryViewSet(CategoryGenreViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = (Category,)
 
 
 class GenreViewSet(CategoryGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = (
-        Title.objects
-        .select_related('category')
-        .prefetch_related('genre')
-        .annotate(rating=Avg('reviews__score'))
-    )
+class TitleViewSet(SparseFieldsMixin,
+                   CachedListModelMixin,
+                   CachedRetrieveModelMixin,
+                   BulkDestroyModelMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category')
     permission_classes = (AdminOrReadOnly, )
+    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'year', 'name', 'created')
+    cache_models = (Title, Genre, Category, Review)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    lookup_value_regex = r'\d+'
+    bulk_delete = staticmethod(delete_title)
+    get_cascade_size = staticmethod(get_title_cascade_size)
+
+    def get_queryset(self):
+        if self.action in ['list', 'retrieve']:
+            return Title.objects.values(
+                *ProjectedTitleSerializer.get_values_fields(
+                    self.get_sparse_fields()
+                )
+            )
+        return super().get_queryset()
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
-            return ReadTitleSerializer
+            return ProjectedTitleSerializer
         return WriteTitleSerializer
 
+    def get_included_reviews(self):
+        """Количество отзывов для встраивания по ?include=reviews[:N]."""
+        if not hasattr(self, '_included_reviews'):
+            serializer = IncludeSerializer(data=self.request.query_params)
+            serializer.is_valid(raise_exception=True)
+            self._included_reviews = serializer.validated_data.get('include')
+        return self._included_reviews
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ['list', 'retrieve']:
+            context['include_reviews'] = self.get_included_reviews()
+        return context
+
+    def get_cache_models(self):
+        # Встроенные отзывы показывают имя автора и счётчики комментариев.
+        if self.get_included_reviews():
+            return (*self.cache_models, Comment, User)
+        return self.cache_models
+
+    @action(
+        detail=True,
+        methods=['get'],
+        url_path='rating-histogram',
+        url_name='rating-histogram',
+    )
+    def rating_histogram(self, request, pk=None):
+        histograms = ScoreBucket.objects.histograms([int(pk)])
+        if not any(histograms[int(pk)].values()):
+            get_object_or_404(Title, pk=pk)
+        serializer = ScoreHistogramSerializer(
+            histograms.items(), many=True
+        )
+        return Response(serializer.data[0], status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='rating-histogram',
+        url_name='rating-histograms',
+    )
+    def rating_histograms(self, request):
+        serializer = TitleIdsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        title_ids = Title.objects.filter(
+            pk__in=serializer.validated_data['ids']
+        ).values_list('pk', flat=True)
+        histograms = ScoreBucket.objects.histograms(title_ids)
+        serializer = ScoreHistogramSerializer(
+            histograms.items(), many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(WriteThrottleMixin,
+                     SparseFieldsMixin,
+                     NestedParentMixin,
+                     ExportMixin,
+                     ModifiedListModelMixin,
+                     ModifiedRetrieveModelMixin,
+                     viewsets.ModelViewSet):
     """Представление для комментариев."""
     model = Comment
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.select_related('author')
     serializer_class = CommentSerializers
     permission_classes = (IsOwnerOrAdminOrModerator,)
     http_method_names = ('get', 'post', 'patch', 'delete')
-
-    def get_review(self):
-        review_id = self.kwargs['review_id']
-        title_id = self.kwargs['title_id']
-        review = get_object_or_404(Review, pk=review_id, title=title_id)
-        return review
+    parent_model = Review
+    parent_lookups = {'pk': 'review_id', 'title_id': 'title_id'}
+    child_lookups = {'review_id': 'review_id', 'review__title_id': 'title_id'}
+    sparse_field_sources = {'author': ('author__username',)}
+    version_models = (Comment, User)
+    write_throttle_scope = 'comments'
 
     def perform_create(self, serializer):
-        comment = self.get_review()
-        serializer.save(author=self.request.user, review=comment)
+        self.check_parent_exists()
+        serializer.save(
+            author_id=self.request.user.pk,
+            review_id=self.get_url_ids(self.parent_lookups)['pk']
+        )
 
-    def get_queryset(self):
-        return self.get_review().comments.all()
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request, title_id=None, review_id=None):
+        """Выгрузка всех комментариев к отзыву в NDJSON."""
+        self.check_parent_exists()
+        return self.get_export_response(request)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(WriteThrottleMixin,
+                    SparseFieldsMixin,
+                    NestedParentMixin,
+                    ExportMixin,
+                    ModifiedListModelMixin,
+                    ModifiedRetrieveModelMixin,
+                    viewsets.ModelViewSet):
     """Представление для отзывов и оценки."""
+    queryset = Review.objects.select_related('author')
     serializer_class = ReviewSerializer
     permission_classes = (IsOwnerOrAdminOrModerator,)
     http_method_names = ('get', 'post', 'patch', 'delete')
+    parent_model = Title
+    parent_lookups = {'pk': 'title_id'}
+    child_lookups = {'title_id': 'title_id'}
+    sparse_field_sources = {'author': ('author__username',)}
+    # Счётчики комментариев в отзыве меняются без сохранения отзыва.
+    version_models = (Review, Comment, User)
+    write_throttle_scope = 'reviews'
 
-    def get_title(self):
-        title_id = self.kwargs['title_id']
-        title = get_object_or_404(Title, pk=title_id)
-        return title
+    def perform_create(self, serializer):
+        self.check_parent_exists()
+        serializer.save(
+            author_id=self.request.user.pk,
+            title_id=self.get_url_ids(self.parent_lookups)['pk']
+        )
 
-    def get_queryset(self):
-        title = self.get_title()
-        return title.reviews.all()
+    def perform_destroy(self, instance):
+        delete_review(instance)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request, title_id=None):
+        """Выгрузка всех отзывов на произведение в NDJSON."""
+        self.check_parent_exists()
+        return self.get_export_response(request)
+
+    @action(
+        detail=False,
+        methods=['put'],
+        url_path='mine',
+        url_name='mine',
+        permission_classes=(IsAuthenticated,),
+        http_method_names=('put', 'options'),
+    )
+    def upsert_mine(self, request, title_id=None):
+        """Создание или замена отзыва текущего пользователя."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.check_parent_exists()
+        review, created = serializer.upsert(
+            request.user.pk, self.get_url_ids(self.parent_lookups)['pk']
+        )
+        return Response(
+            self.get_serializer(review).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class JobViewSet(viewsets.ViewSet):
+    """Статус фоновой задачи."""
+    permission_classes = (IsAdmin,)
+
+    def retrieve(self, request, pk=None):
+        job = jobs.get_status(pk)
+        if job is None:
+            raise Http404
+        return Response(job, status=status.HTTP_200_OK)
 
-    def perform_create(self, serializer):
-        title = self.get_title()
-        author = self.request.user
-        serializer.save(title=title, author=author)
 
+class ReviewExportViewSet(ExportViewSet):
+    """Выгрузка отзывов на все произведения."""
+    queryset = Review.objects.all()
 
+
+class CommentExportViewSet(ExportViewSet):
+    """Выгрузка всех комментариев."""
+    queryset = Comment.objects.all()
+
+
+@api_view(['POST'])
+@permission_classes([IsAdmin])
+def batch_reviews(request):
+    """Пакетная загрузка отзывов на разные произведения."""
+    serializer = ReviewBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    serializer.save()
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@throttle_scope('signup')
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def send_confirmation_code(request):
@@ -101,30 +264,33 @@ def send_confirmation_code(request):
     return Response(serializer.validated_data, status=status.HTTP_200_OK)
 
 
+@throttle_scope('token')
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def send_token(request):
     """Отправляем токен при отправке кода подтверждения."""
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    user = get_object_or_404(
-        User,
-        username=serializer.validated_data['username']
-    )
-    anwser = {'token': str(AccessToken.for_user(user))}
+    user = serializer.validated_data['user']
+    anwser = {'token': str(ClaimsAccessToken.for_user(user))}
     return Response(anwser, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SparseFieldsMixin,
+                  BulkDestroyModelMixin,
+                  viewsets.ModelViewSet):
     """Вью-класс для пользователей."""
 
     queryset = User.objects.all()
     serializer_class = UserSerializer
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (DjangoFilterBackend, filters.SearchFilter)
+    filterset_class = UserFilter
     search_fields = ('username', )
     permission_classes = (IsAdmin,)
     http_method_names = ('get', 'post', 'patch', 'delete')
     lookup_field = 'username'
+    bulk_delete = staticmethod(delete_user)
+    get_cascade_size = staticmethod(get_user_cascade_size)
 
     @action(
         detail=False,
@@ -134,9 +300,10 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsAuthenticated,)
     )
     def get_me_data(self, request):
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = MeSerializer(
-                request.user,
+                user,
                 data=request.data,
                 partial=True,
                 context={'request': request}
@@ -144,5 +311,5 @@ class UserViewSet(viewsets.ModelViewSet):
             serializer.is_valid(raise_exception=True)
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = MeSerializer(request.user)
+        serializer = MeSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -1,13 +1,25 @@
 from rest_framework import filters, mixins, viewsets
 
-from api.permission import AdminOrReadOnly
+from api.mixins import (CachedListModelMixin, ExportListModelMixin,
+                        SparseFieldsMixin)
+from api.permission import AdminOrReadOnly, IsAdmin
 
 
-class CategoryGenreViewSet(mixins.CreateModelMixin,
+class CategoryGenreViewSet(SparseFieldsMixin,
+                           mixins.CreateModelMixin,
                            mixins.DestroyModelMixin,
+                           CachedListModelMixin,
                            mixins.ListModelMixin,
                            viewsets.GenericViewSet):
     permission_classes = (AdminOrReadOnly,)
     lookup_field = 'slug'
     filter_backends = (filters.SearchFilter,)
     search_fields = ('=name',)
+
+
+class ExportViewSet(ExportListModelMixin, viewsets.GenericViewSet):
+    """Выгрузка всех объектов модели в NDJSON, только администратору."""
+
+    permission_classes = (IsAdmin,)
+    pagination_class = None
+    throttle_scope = ExportListModelMixin.export_throttle_scope
@@ -37,6 +37,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.NPlusOneDetectorMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -117,20 +118,72 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StatelessJWTAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.LimitOffsetOrCursorPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.IPSlidingWindowThrottle',
+        'api.throttling.UserSlidingWindowThrottle',
+    ],
+    # Число обратных прокси перед приложением: троттлинг по IP-адресу берёт
+    # адрес из X-Forwarded-For только за ними. При 0 заголовок, который
+    # может подставить сам клиент, не учитывается.
+    'NUM_PROXIES': 0,
+    # Число запросов за период: '<область>.ip' - на IP-адрес,
+    # '<область>.user' - на пользователя.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup.ip': '20/min',
+        'token.ip': '20/min',
+        'reviews.ip': '120/min',
+        'reviews.user': '60/min',
+        'comments.ip': '240/min',
+        'comments.user': '120/min',
+        'export.ip': '10/min',
+        'export.user': '10/min',
+    },
 }
 
+# Кэш ответов API: версии моделей и данные ответов хранятся в этом кэше,
+# поэтому при нескольких процессах нужен общий бэкенд (Redis, Memcached).
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 5 * 60
+
+# Поиск N+1: доля проверяемых запросов (0 - выключено) и число повторов
+# запроса одной формы, начиная с которого он попадает в лог.
+N_PLUS_ONE_SAMPLE_RATE = 0
+N_PLUS_ONE_THRESHOLD = 3
+
+# Произведения и пользователи, у которых больше стольких отзывов и
+# комментариев, удаляются фоновой задачей с ответом 202.
+BULK_DELETE_SYNC_LIMIT = 1000
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(weeks=5),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Сколько после выдачи токена его роль и флаги считаются актуальными:
+# на это время изменение роли не действует на уже выданные токены.
+JWT_CLAIMS_LIFETIME = timedelta(minutes=5)
+
 # Настройки для почты
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'email_messages'
+
+# Очередь писем: размер, число потоков, писем на одно соединение,
+# ожидание места в очереди, повторы с начальной задержкой и время на
+# досылку при остановке (в секундах). EMAIL_QUEUE_EAGER отправляет
+# письма сразу, без очереди.
+EMAIL_QUEUE_SIZE = 1000
+EMAIL_QUEUE_WORKERS = 2
+EMAIL_BATCH_SIZE = 50
+EMAIL_QUEUE_TIMEOUT = 1
+EMAIL_RETRIES = 3
+EMAIL_RETRY_BACKOFF = 0.5
+EMAIL_SHUTDOWN_TIMEOUT = 5
+EMAIL_QUEUE_EAGER = False
+
 ADMIN_EMAIL = "webmaster@localhost"
 DEFAULT_FROM_EMAIL = "webmaster@localhost"
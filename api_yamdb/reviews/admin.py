@@ -32,6 +32,7 @@ class TitleAdmin(admin.ModelAdmin):
         'name',
         'year',
         'category',
+        'rating',
     )
     list_filter = ('category',)
     empty_value_display = '-пусто-'
@@ -44,6 +45,7 @@ class ReviewAdmin(admin.ModelAdmin):
         'title',
         'author',
         'score',
+        'comments_count',
         'pub_date',
     )
     list_filter = ('author',)
@@ -58,5 +60,6 @@ class CommentAdmin(admin.ModelAdmin):
         'author',
         'pub_date',
     )
+    list_select_related = ('review__title', 'review__author', 'author')
     list_filter = ('author',)
     empty_value_display = '-пусто-'
@@ -1,2 +1,4 @@
 MAX_LENGTH_CHARFIELDS = 256
 MAX_LENGTH_SLUGFIELDS = 50
+MIN_SCORE = 1
+MAX_SCORE = 10
@@ -0,0 +1,161 @@
+"""
+Удаление произведений, пользователей и отзывов вместе с зависимыми записями.
+
+Collector Django загружает в память каждый зависимый объект, чтобы
+отправить сигналы. Здесь зависимые записи удаляются пакетами запросами
+DELETE ... WHERE id IN (...), каждый пакет - в своей короткой транзакции,
+а счётчики, которые поддерживают сигналы, сдвигаются в ней же по итогам
+всего пакета. Сам объект удаляется последним, когда зависимостей уже
+не осталось.
+"""
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from api.cache import bump_version
+from reviews.models import Comment, Review, ScoreBucket, Title
+
+User = get_user_model()
+
+DELETE_BATCH_SIZE = 500
+
+
+def get_title_cascade_size(title_id):
+    """Количество отзывов и комментариев, удаляемых с произведением."""
+    return _get_reviews_cascade_size(
+        Review.objects.filter(title_id=title_id)
+    )
+
+
+def get_user_cascade_size(user_id):
+    """
+    Количество отзывов и комментариев, удаляемых с пользователем.
+
+    С отзывами пользователя удаляются и чужие комментарии к ним, а его
+    комментарии к своим отзывам уже учтены в comments_count.
+    """
+    return _get_reviews_cascade_size(
+        Review.objects.filter(author_id=user_id)
+    ) + Comment.objects.filter(author_id=user_id).exclude(
+        review__author_id=user_id
+    ).count()
+
+
+def delete_title(title_id, batch_size=DELETE_BATCH_SIZE):
+    """Удаляет произведение, его отзывы и комментарии к ним."""
+    result = delete_reviews(
+        Review.objects.filter(title_id=title_id), batch_size
+    )
+    result['titles'] = Title.objects.filter(pk=title_id).delete()[1].get(
+        Title._meta.label, 0
+    )
+    return result
+
+
+def delete_user(user_id, batch_size=DELETE_BATCH_SIZE):
+    """Удаляет пользователя, его отзывы и комментарии."""
+    result = delete_reviews(
+        Review.objects.filter(author_id=user_id), batch_size
+    )
+    result['comments'] += delete_comments(
+        Comment.objects.filter(author_id=user_id), batch_size
+    )
+    result['users'] = User.objects.filter(pk=user_id).delete()[1].get(
+        User._meta.label, 0
+    )
+    return result
+
+
+def delete_review(review):
+    """
+    Удаляет отзыв и комментарии к нему.
+
+    Комментарии удаляются одним DELETE без сигналов: иначе Collector
+    загрузил бы каждый и сдвинул счётчик удаляемого отзыва по одному.
+    """
+    with transaction.atomic():
+        comments = _raw_delete(Comment.objects.filter(review_id=review.pk))
+        review.delete()
+        transaction.on_commit(lambda: bump_version(Comment))
+    return {'reviews': 1, 'comments': comments}
+
+
+def delete_reviews(reviews, batch_size=DELETE_BATCH_SIZE):
+    """Пакетно удаляет отзывы и комментарии к ним, обновляя рейтинги."""
+    result = {'reviews': 0, 'comments': 0}
+    while True:
+        with transaction.atomic():
+            ids = list(reviews.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            result['comments'] += _raw_delete(
+                Comment.objects.filter(review_id__in=ids)
+            )
+            _discount_scores(ids)
+            result['reviews'] += _raw_delete(
+                Review.objects.filter(pk__in=ids)
+            )
+            transaction.on_commit(lambda: bump_version(Comment))
+            transaction.on_commit(lambda: bump_version(Review))
+            transaction.on_commit(lambda: bump_version(Title))
+    return result
+
+
+def delete_comments(comments, batch_size=DELETE_BATCH_SIZE):
+    """Пакетно удаляет комментарии, обновляя счётчики отзывов."""
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                comments.order_by().values_list('pk', 'review_id')[
+                    :batch_size
+                ]
+            )
+            if not rows:
+                break
+            deleted += _raw_delete(
+                Comment.objects.filter(pk__in=[pk for pk, _ in rows])
+            )
+            counts = defaultdict(int)
+            for _, review_id in rows:
+                counts[review_id] += 1
+            for review_id, count in counts.items():
+                Review.objects.filter(pk=review_id).shift_comments(-count)
+            transaction.on_commit(lambda: bump_version(Comment))
+            transaction.on_commit(lambda: bump_version(Review))
+    return deleted
+
+
+def _get_reviews_cascade_size(reviews):
+    size = reviews.aggregate(
+        reviews=Count('pk'), comments=Sum('comments_count')
+    )
+    return size['reviews'] + (size['comments'] or 0)
+
+
+def _discount_scores(review_ids):
+    """Убирает оценки отзывов из рейтингов и распределений произведений."""
+    buckets = (
+        Review.objects
+        .filter(pk__in=review_ids)
+        .order_by()
+        .values_list('title_id', 'score')
+        .annotate(count=Count('pk'))
+    )
+    totals = defaultdict(lambda: [0, 0])
+    for title_id, score, count in buckets:
+        totals[title_id][0] += score * count
+        totals[title_id][1] += count
+        ScoreBucket.objects.shift(title_id, score, -count)
+    for title_id, (score_sum, score_count) in totals.items():
+        Title.objects.filter(pk=title_id).shift_scores(
+            -score_sum, -score_count
+        )
+
+
+def _raw_delete(queryset):
+    # Удаление без Collector: сигналы не отправляются, а счётчики,
+    # которые они поддерживают, вызывающий код сдвигает сам.
+    return queryset._raw_delete(queryset.db)
@@ -0,0 +1,50 @@
+"""
+Построчная выгрузка отзывов и комментариев в NDJSON.
+
+Строки читаются из БД через QuerySet.iterator порциями по chunk_size
+и сразу кодируются, поэтому память не зависит от размера выгрузки.
+Записи идут по возрастанию (pub_date, id): так выгрузку можно продолжить
+с даты последней полученной записи, передав её в since.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment, Review
+
+EXPORT_CHUNK_SIZE = 2000
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+# Ключ в выгрузке -> поле или связь модели.
+EXPORT_FIELDS = {
+    Review: {
+        'id': 'id',
+        'title_id': 'title_id',
+        'author': 'author__username',
+        'text': 'text',
+        'score': 'score',
+        'pub_date': 'pub_date',
+    },
+    Comment: {
+        'id': 'id',
+        'title_id': 'review__title_id',
+        'review_id': 'review_id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+    },
+}
+
+
+def get_export_queryset(queryset, since=None):
+    """Строки выгрузки для отзывов или комментариев из queryset."""
+    if since is not None:
+        queryset = queryset.filter(pub_date__gte=since)
+    return queryset.order_by('pub_date', 'pk').values_list(
+        *EXPORT_FIELDS[queryset.model].values()
+    )
+
+
+def iter_ndjson(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Кодирует строки queryset в NDJSON по одной."""
+    keys = tuple(EXPORT_FIELDS[queryset.model])
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in queryset.iterator(chunk_size=chunk_size):
+        yield encoder.encode(dict(zip(keys, row))) + '\n'
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from reviews.export import EXPORT_CHUNK_SIZE, get_export_queryset, iter_ndjson
+from reviews.models import Comment, Review
+
+EXPORT_MODELS = {'reviews': Review, 'comments': Comment}
+
+
+class Command(BaseCommand):
+    help = 'Export reviews or comments to NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=EXPORT_MODELS)
+        parser.add_argument(
+            '--title', type=int, help='Только отзывы на произведение'
+        )
+        parser.add_argument(
+            '--since', help='Только записи, опубликованные не раньше даты'
+        )
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        model = EXPORT_MODELS[options['model']]
+        queryset = model.objects.all()
+        if options['title'] is not None:
+            lookup = 'title_id' if model is Review else 'review__title_id'
+            queryset = queryset.filter(**{lookup: options['title']})
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(
+                    f'Неверный формат даты: {options["since"]}'
+                )
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        lines = iter_ndjson(
+            get_export_queryset(queryset, since), options['chunk_size']
+        )
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], mode='w', encoding='utf8') as f:
+            f.writelines(lines)
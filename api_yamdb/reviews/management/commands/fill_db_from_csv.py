@@ -3,6 +3,7 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
+from api.cache import bump_version
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
@@ -33,9 +34,20 @@ class Command(BaseCommand):
                     if replace:
                         for old, new in replace.items():
                             args[new] = args.pop(old)
-                    objects_to_create.append(model(**args))
+                    obj = model(**args)
+                    if model is User:
+                        obj.set_search_fields()
+                    objects_to_create.append(obj)
                 model.objects.bulk_create(objects_to_create,
                                           ignore_conflicts=True)
+                bump_version(model)
                 self.stdout.write(
                     f'Добавлено объектов: {len(objects_to_create)}; '
                     f'строк в документе: {counter}')
+        # bulk_create не отправляет сигналы, поэтому рейтинг пересчитывается
+        # одним запросом после импорта отзывов.
+        Title.objects.recount_scores()
+        bump_version(Title)
+        self.stdout.write('Рейтинг произведений пересчитан')
+        Review.objects.recount_comments()
+        self.stdout.write('Счётчики комментариев пересчитаны')
@@ -0,0 +1,48 @@
+# Generated by Django 3.2 on 2026-10-17 21:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_score_buckets(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    ScoreBucket = apps.get_model('reviews', 'ScoreBucket')
+    ScoreBucket.objects.bulk_create(
+        ScoreBucket(**bucket)
+        for bucket in (
+            Review.objects
+            .order_by()
+            .values('title_id', 'score')
+            .annotate(count=Count('pk'))
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.PositiveSmallIntegerField(verbose_name='Оценка')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Количество оценок')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'Распределение оценок',
+                'verbose_name_plural': 'Распределения оценок',
+                'default_related_name': 'score_buckets',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scorebucket',
+            constraint=models.UniqueConstraint(fields=('title', 'score'), name='unique_title_score'),
+        ),
+        migrations.RunPython(fill_score_buckets, migrations.RunPython.noop),
+    ]
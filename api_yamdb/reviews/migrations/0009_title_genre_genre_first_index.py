@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_updated'),
+    ]
+
+    operations = [
+        # Уникальный индекс промежуточной таблицы начинается с title_id и не
+        # подходит для поиска произведений по жанру; составной индекс
+        # (genre_id, title_id) покрывает такие подзапросы целиком.
+        migrations.RunSQL(
+            'CREATE INDEX reviews_title_genre_genre_title_idx '
+            'ON reviews_title_genre (genre_id, title_id)',
+            'DROP INDEX reviews_title_genre_genre_title_idx',
+        ),
+    ]
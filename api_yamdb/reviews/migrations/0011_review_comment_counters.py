@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-17 21:30
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_comments(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    comments = (
+        Comment.objects
+        .filter(review=OuterRef('pk'))
+        .order_by()
+        .values('review')
+    )
+    Review.objects.update(
+        comments_count=Coalesce(
+            Subquery(comments.annotate(total=Count('pk')).values('total')), 0
+        ),
+        last_comment_at=Subquery(
+            comments.annotate(last=Max('pub_date')).values('last')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_review_comment_pub_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='last_comment_at',
+            field=models.DateTimeField(default=None, editable=False, null=True, verbose_name='Дата последнего комментария'),
+        ),
+        migrations.RunPython(recount_comments, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,29 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import (Count, ExpressionWrapper, F, Max, OuterRef,
+                              Subquery, Sum)
+from django.db.models.expressions import RawSQL, Window
+from django.db.models.functions import Coalesce, NullIf, RowNumber
+from django.utils import timezone
 
-from reviews.constants import MAX_LENGTH_CHARFIELDS, MAX_LENGTH_SLUGFIELDS
+from reviews.constants import (MAX_LENGTH_CHARFIELDS, MAX_LENGTH_SLUGFIELDS,
+                               MAX_SCORE, MIN_SCORE)
 from reviews.validators import validate_year
 
 User = get_user_model()
 
 TEXT_LIMIT = 50
+RATING_FIELDS = ('score_sum', 'score_count', 'rating')
+COMMENT_FIELDS = ('comments_count', 'last_comment_at')
+
+
+def get_update_fields(instance, counter_fields):
+    """Поля для обновления объекта без денормализованных счётчиков."""
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counter_fields
+    ]
 
 
 class NameSlug(models.Model):
@@ -39,6 +55,58 @@ class Genre(NameSlug):
         return self.slug
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def shift_scores(self, score_delta, count_delta):
+        """Атомарно сдвигает счётчики оценок и пересчитывает рейтинг."""
+        score_sum = ExpressionWrapper(
+            F('score_sum') + score_delta,
+            output_field=models.PositiveIntegerField()
+        )
+        score_count = ExpressionWrapper(
+            F('score_count') + count_delta,
+            output_field=models.PositiveIntegerField()
+        )
+        return self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=score_sum / NullIf(score_count, 0),
+        )
+
+    def recount_scores(self):
+        """Пересчитывает рейтинг и распределение оценок по отзывам."""
+        reviews = (
+            Review.objects
+            .filter(title=OuterRef('pk'))
+            .order_by()
+            .values('title')
+        )
+        score_sum = Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')), 0
+        )
+        score_count = Coalesce(
+            Subquery(reviews.annotate(total=Count('pk')).values('total')), 0
+        )
+        updated = self.update(
+            score_sum=score_sum,
+            score_count=score_count,
+            rating=score_sum / NullIf(score_count, 0),
+        )
+        buckets = ScoreBucket.objects.filter(title__in=self)
+        buckets.delete()
+        ScoreBucket.objects.bulk_create(
+            ScoreBucket(**bucket)
+            for bucket in (
+                Review.objects
+                .filter(title__in=self)
+                .order_by()
+                .values('title_id', 'score')
+                .annotate(count=Count('pk'))
+            )
+        )
+        return updated
+
+
 class Title(models.Model):
     name = models.CharField(
         verbose_name='Название',
@@ -60,16 +128,124 @@ class Title(models.Model):
         auto_now_add=True,
         db_index=True,
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    score_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.PositiveSmallIntegerField(
+        verbose_name='Рейтинг',
+        null=True,
+        default=None,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'titles'
         verbose_name = 'Название'
         verbose_name_plural = 'Названия'
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            ),
+            models.Index(
+                fields=['category', '-created'],
+                name='title_category_created_idx'
+            ),
+            models.Index(fields=['rating'], name='title_rating_idx'),
+            models.Index(fields=['year'], name='title_year_idx'),
+            models.Index(fields=['name'], name='title_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def set_genres(self, genres, created=False):
+        """Заменяет жанры произведения одним удалением и одной вставкой."""
+        through = Title.genre.through
+        genre_ids = {genre.pk for genre in genres}
+        if not created:
+            through.objects.filter(title=self).exclude(
+                genre_id__in=genre_ids
+            ).delete()
+        through.objects.bulk_create(
+            [through(title=self, genre_id=pk) for pk in genre_ids],
+            ignore_conflicts=not created
+        )
+
+    def save(self, *args, **kwargs):
+        # Счётчики оценок меняются только атомарными UPDATE из сигналов
+        # отзывов, поэтому обычное сохранение не должно их перезаписывать.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = get_update_fields(self, RATING_FIELDS)
+        super().save(*args, **kwargs)
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def latest_per_title(self, title_ids, limit):
+        """
+        Не больше limit последних отзывов на каждое из произведений.
+
+        Отзывы нумеруются ROW_NUMBER() в окне по произведению, и всё
+        выбирается одним запросом с подзапросом по номеру в окне.
+        """
+        ranked = self.filter(title_id__in=title_ids).annotate(
+            review_rank=Window(
+                RowNumber(),
+                partition_by=[F('title_id')],
+                order_by=[F('pub_date').desc(), F('pk').desc()],
+            )
+        ).order_by().values('pk', 'review_rank')
+        sql, params = ranked.query.sql_with_params()
+        return self.filter(pk__in=RawSQL(
+            f'SELECT ranked.id FROM ({sql}) ranked '
+            'WHERE ranked.review_rank <= %s',
+            (*params, limit)
+        ))
+
+    def shift_comments(self, delta):
+        """Атомарно сдвигает счётчик комментариев и дату последнего."""
+        last_comment = (
+            Comment.objects
+            .filter(review=OuterRef('pk'))
+            .order_by('-pub_date')
+            .values('pub_date')[:1]
+        )
+        # updated меняется вместе со счётчиком, чтобы сменился ETag списка.
+        return self.update(
+            comments_count=F('comments_count') + delta,
+            last_comment_at=Subquery(last_comment),
+            updated=timezone.now(),
+        )
+
+    def recount_comments(self):
+        """Пересчитывает счётчики комментариев по самим комментариям."""
+        comments = (
+            Comment.objects
+            .filter(review=OuterRef('pk'))
+            .order_by()
+            .values('review')
+        )
+        return self.update(
+            comments_count=Coalesce(
+                Subquery(comments.annotate(total=Count('pk')).values('total')),
+                0
+            ),
+            last_comment_at=Subquery(
+                comments.annotate(last=Max('pub_date')).values('last')
+            ),
+        )
+
 
 class Review(models.Model):
     text = models.TextField(verbose_name='Текст')
@@ -86,14 +262,36 @@ class Review(models.Model):
     score = models.PositiveSmallIntegerField(
         default=1,
         validators=[
-            MinValueValidator(1, 'Значение рейтинга не может быть ниже 1.'),
-            MaxValueValidator(10, 'Значение рейтинга не может быть выше 10.')
+            MinValueValidator(
+                MIN_SCORE,
+                f'Значение рейтинга не может быть ниже {MIN_SCORE}.'
+            ),
+            MaxValueValidator(
+                MAX_SCORE,
+                f'Значение рейтинга не может быть выше {MAX_SCORE}.'
+            )
         ],
         verbose_name='Рейтинг'
     )
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации отзыва'
     )
+    updated = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения отзыва'
+    )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    last_comment_at = models.DateTimeField(
+        verbose_name='Дата последнего комментария',
+        null=True,
+        default=None,
+        editable=False,
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         constraints = [
@@ -102,6 +300,23 @@ class Review(models.Model):
                 name='unique_author_title'
             )
         ]
+        # Ключ (родитель, pub_date, id) при обратном обходе индекса отдаёт
+        # и сортировку по умолчанию, и курсорную (pub_date, pk) без
+        # сортировки во временном B-дереве.
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='review_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='review_pub_date_idx'
+            ),
+        ]
         default_related_name = 'reviews'
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
@@ -110,6 +325,73 @@ class Review(models.Model):
     def __str__(self):
         return f'Отзыв {self.author.username} на {self.title.name}'
 
+    def save(self, *args, **kwargs):
+        # Счётчики комментариев, как и рейтинг, меняют только сигналы.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = get_update_fields(self, COMMENT_FIELDS)
+        # Отзыв и рейтинг произведения сохраняются в одной транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
+
+class ScoreBucketQuerySet(models.QuerySet):
+
+    def shift(self, title_id, score, delta):
+        """Атомарно сдвигает количество оценок score у произведения."""
+        if delta > 0:
+            self.bulk_create(
+                [self.model(title_id=title_id, score=score)],
+                ignore_conflicts=True
+            )
+        return self.filter(title_id=title_id, score=score).update(
+            count=F('count') + delta
+        )
+
+    def histograms(self, title_ids):
+        """Возвращает распределение оценок для каждого из произведений."""
+        result = {
+            title_id: dict.fromkeys(range(MIN_SCORE, MAX_SCORE + 1), 0)
+            for title_id in title_ids
+        }
+        buckets = (
+            self.filter(title_id__in=result, count__gt=0)
+            .values_list('title_id', 'score', 'count')
+        )
+        for title_id, score, count in buckets:
+            result[title_id][score] = count
+        return result
+
+
+class ScoreBucket(models.Model):
+    """Количество оценок одного значения у произведения."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        verbose_name='Произведение',
+    )
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+    )
+
+    objects = ScoreBucketQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_title_score'
+            )
+        ]
+        default_related_name = 'score_buckets'
+        verbose_name = 'Распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
 
 class Comment(models.Model):
     text = models.TextField(verbose_name='text')
@@ -127,8 +409,26 @@ class Comment(models.Model):
         verbose_name='Дата публикации комментария',
         auto_now_add=True,
     )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения комментария',
+        auto_now=True,
+    )
 
     class Meta:
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date', 'id'],
+                name='comment_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['pub_date', 'id'],
+                name='comment_pub_date_idx'
+            ),
+        ]
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
@@ -136,3 +436,8 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text[:TEXT_LIMIT]
+
+    def save(self, *args, **kwargs):
+        # Комментарий и счётчики отзыва сохраняются в одной транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
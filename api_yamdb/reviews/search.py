@@ -0,0 +1,151 @@
+"""
+Полнотекстовый поиск по названию и описанию произведений.
+
+На SQLite используется внешняя FTS5-таблица, которую синхронизируют
+триггеры на reviews_title, на PostgreSQL - GIN-индекс по выражению
+to_tsvector('russian', ...). Для остальных СУБД поиск сводится к icontains.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+SQLITE_FTS_TABLE = 'reviews_title_fts'
+SQLITE_FTS_TOKENIZER = 'unicode61 remove_diacritics 2'
+SQLITE_FTS_COLUMNS = ('name', 'description')
+SQLITE_FTS_TRIGGERS = {
+    f'{SQLITE_FTS_TABLE}_ai': (
+        'AFTER INSERT ON reviews_title BEGIN '
+        f'INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) '
+        'VALUES (new.id, new.name, new.description); END'
+    ),
+    f'{SQLITE_FTS_TABLE}_ad': (
+        'AFTER DELETE ON reviews_title BEGIN '
+        f'INSERT INTO {SQLITE_FTS_TABLE}'
+        f'({SQLITE_FTS_TABLE}, rowid, name, description) '
+        "VALUES ('delete', old.id, old.name, old.description); END"
+    ),
+    f'{SQLITE_FTS_TABLE}_au': (
+        'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+        f'INSERT INTO {SQLITE_FTS_TABLE}'
+        f'({SQLITE_FTS_TABLE}, rowid, name, description) '
+        "VALUES ('delete', old.id, old.name, old.description); "
+        f'INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) '
+        'VALUES (new.id, new.name, new.description); END'
+    ),
+}
+
+POSTGRES_SEARCH_CONFIG = 'russian'
+POSTGRES_SEARCH_INDEX = 'reviews_title_search_idx'
+POSTGRES_SEARCH_VECTOR = (
+    f"to_tsvector('{POSTGRES_SEARCH_CONFIG}', "
+    "coalesce(reviews_title.name, '') || ' ' || "
+    "coalesce(reviews_title.description, ''))"
+)
+
+
+def create_search_index(schema_editor):
+    """Создаёт поисковый индекс произведений для текущей СУБД."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} '
+            f'USING fts5({", ".join(SQLITE_FTS_COLUMNS)}, '
+            "content='reviews_title', content_rowid='id', "
+            f"tokenize='{SQLITE_FTS_TOKENIZER}')"
+        )
+        _create_sqlite_triggers(schema_editor.connection)
+        _rebuild_sqlite_index(schema_editor.connection)
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {POSTGRES_SEARCH_INDEX} '
+            f'ON reviews_title USING GIN ({POSTGRES_SEARCH_VECTOR})'
+        )
+
+
+def drop_search_index(schema_editor):
+    """Удаляет поисковый индекс произведений."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for trigger in SQLITE_FTS_TRIGGERS:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRES_SEARCH_INDEX}')
+
+
+def ensure_search_index(sender, using, **kwargs):
+    """
+    Восстанавливает триггеры FTS5 после миграций.
+
+    SQLite пересоздаёт таблицу при изменении её схемы, и триггеры
+    reviews_title при этом удаляются вместе со старой таблицей.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' "
+            'AND name IN (%s, %s)',
+            [SQLITE_FTS_TABLE, 'reviews_title']
+        )
+        if len(cursor.fetchall()) < 2:
+            return
+    if _create_sqlite_triggers(connection):
+        _rebuild_sqlite_index(connection)
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по запросу и сортирует по релевантности."""
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return queryset.none()
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            select={'search_rank': f'{SQLITE_FTS_TABLE}.rank'},
+            tables=[SQLITE_FTS_TABLE],
+            where=[
+                f'{SQLITE_FTS_TABLE}.rowid = reviews_title.id',
+                f'{SQLITE_FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+        ).order_by('search_rank')
+    if vendor == 'postgresql':
+        tsquery = f"plainto_tsquery('{POSTGRES_SEARCH_CONFIG}', %s)"
+        return queryset.extra(
+            select={
+                'search_rank': f'ts_rank({POSTGRES_SEARCH_VECTOR}, {tsquery})'
+            },
+            select_params=[query],
+            where=[f'{POSTGRES_SEARCH_VECTOR} @@ {tsquery}'],
+            params=[query],
+        ).order_by('-search_rank')
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    )
+
+
+def _create_sqlite_triggers(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'reviews_title'"
+        )
+        existing = {name for name, in cursor.fetchall()}
+        missing = set(SQLITE_FTS_TRIGGERS) - existing
+        for trigger in missing:
+            cursor.execute(
+                f'CREATE TRIGGER {trigger} {SQLITE_FTS_TRIGGERS[trigger]}'
+            )
+    return bool(missing)
+
+
+def _rebuild_sqlite_index(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) '
+            "VALUES ('rebuild')"
+        )
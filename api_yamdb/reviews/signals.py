@@ -0,0 +1,53 @@
+from django.db.models import Subquery
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reviews.models import Comment, Review, ScoreBucket, Title
+
+
+@receiver(pre_save, sender=Review)
+def shift_rating_on_review_update(sender, instance, update_fields=None,
+                                  **kwargs):
+    """Учитывает изменение оценки в рейтинге произведения."""
+    if instance._state.adding:
+        return
+    if update_fields is not None and 'score' not in update_fields:
+        return
+    old_score = Review.objects.filter(pk=instance.pk).values('score')
+    Title.objects.filter(pk=instance.title_id).shift_scores(
+        instance.score - Subquery(old_score), 0
+    )
+    ScoreBucket.objects.shift(instance.title_id, Subquery(old_score), -1)
+    ScoreBucket.objects.shift(instance.title_id, instance.score, 1)
+
+
+@receiver(post_save, sender=Review)
+def shift_rating_on_review_create(sender, instance, created, **kwargs):
+    """Добавляет оценку нового отзыва в рейтинг произведения."""
+    if created:
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            instance.score, 1
+        )
+        ScoreBucket.objects.shift(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def shift_rating_on_review_delete(sender, instance, **kwargs):
+    """Убирает оценку удалённого отзыва из рейтинга произведения."""
+    Title.objects.filter(pk=instance.title_id).shift_scores(
+        -instance.score, -1
+    )
+    ScoreBucket.objects.shift(instance.title_id, instance.score, -1)
+
+
+@receiver(post_save, sender=Comment)
+def shift_comments_on_comment_create(sender, instance, created, **kwargs):
+    """Учитывает новый комментарий в счётчиках отзыва."""
+    if created:
+        Review.objects.filter(pk=instance.review_id).shift_comments(1)
+
+
+@receiver(post_delete, sender=Comment)
+def shift_comments_on_comment_delete(sender, instance, **kwargs):
+    """Убирает удалённый комментарий из счётчиков отзыва."""
+    Review.objects.filter(pk=instance.review_id).shift_comments(-1)
@@ -0,0 +1,49 @@
+# Generated by Django 3.2 on 2026-10-17 21:59
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_search_fields(apps, schema_editor):
+    # Значения приводятся к нижнему регистру в Python, как в User.save:
+    # LOWER() в SQLite меняет только ASCII.
+    User = apps.get_model('users', 'User')
+    users = []
+    for user in User.objects.only('username', 'email').iterator(BATCH_SIZE):
+        user.username_lower = user.username.lower()
+        user.email_lower = user.email.lower()
+        users.append(user)
+        if len(users) == BATCH_SIZE:
+            User.objects.bulk_update(users, ('username_lower', 'email_lower'))
+            users = []
+    User.objects.bulk_update(users, ('username_lower', 'email_lower'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_lower',
+            field=models.CharField(default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='username_lower',
+            field=models.CharField(default='', editable=False, max_length=150),
+        ),
+        migrations.RunPython(fill_search_fields, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['username_lower', 'id'], name='user_username_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['email_lower'], name='user_email_lower_idx'),
+        ),
+    ]
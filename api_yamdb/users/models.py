@@ -47,8 +47,21 @@ class User(AbstractUser):
         default='user'
     )
 
+    username_lower = models.CharField(
+        max_length=MAX_USERNAME_LENGTH,
+        editable=False,
+        default=''
+    )
+    email_lower = models.CharField(
+        max_length=MAX_EMAIL_LENGTH,
+        editable=False,
+        default=''
+    )
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
+    # Поля для поиска без учёта регистра -> исходные поля.
+    SEARCH_FIELDS = {'username_lower': 'username', 'email_lower': 'email'}
 
     @property
     def is_admin(self):
@@ -58,8 +71,30 @@ class User(AbstractUser):
     def is_moderator(self):
         return self.role == self.MODERATOR
 
+    def set_search_fields(self):
+        """Заполняет поля для поиска без учёта регистра."""
+        for field, source in self.SEARCH_FIELDS.items():
+            setattr(self, field, getattr(self, source).lower())
+
+    def save(self, *args, **kwargs):
+        self.set_search_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *(
+                field for field, source in self.SEARCH_FIELDS.items()
+                if source in update_fields
+            )}
+        super().save(*args, **kwargs)
+
     class Meta:
 
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('username',)
+        indexes = (
+            models.Index(
+                fields=('username_lower', 'id'),
+                name='user_username_lower_idx'
+            ),
+            models.Index(fields=('email_lower',), name='user_email_lower_idx'),
+        )
@@ -0,0 +1,114 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_review_writes(self, admin_client, admin,
+                                             user_client, user,
+                                             moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        response = moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+    def test_02_rating_follows_cascade_delete(self, admin_client, user,
+                                              user_client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        title_id = titles[1]['id']
+        create_single_review(user_client, title_id, 'Неплохо', 3)
+        assert self.get_rating(admin_client, title_id) == 3
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с пользователем.'
+        )
+        assert self.get_rating(admin_client, titles[0]['id']) is None
+
+    def test_03_rating_histogram(self, client, admin_client, admin,
+                                 user_client, user):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 8}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+        url = f'/api/v1/titles/{title_id}/rating-histogram/'
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        histogram = response.json()['histogram']
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'5': 1, '8': 1})
+        assert histogram == expected, (
+            'Проверьте, что распределение оценок произведения учитывает '
+            'создание и изменение отзывов.'
+        )
+
+        response = client.get(
+            '/api/v1/titles/rating-histogram/',
+            {'ids': f'{title_id},{titles[1]["id"]},999'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        data = {item['id']: item['histogram'] for item in response.json()}
+        assert set(data) == {title_id, titles[1]['id']}
+        assert data[title_id] == expected
+        assert not any(data[titles[1]['id']].values())
+
+        response = client.get('/api/v1/titles/999/rating-histogram/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
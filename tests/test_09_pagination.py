@@ -0,0 +1,67 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def walk(self, client, url, params=None):
+        pages = []
+        response = client.get(url, params)
+        while True:
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что курсорная пагинация `{url}` возвращает '
+                'ответ со статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data
+            pages.append(data)
+            if not data['next']:
+                return pages
+            response = client.get(data['next'])
+
+    def test_01_cursor_walks_every_title_once(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            data = dict(title, name=f'{title["name"]} 2')
+            data.pop('id')
+            admin_client.post(self.TITLES_URL, data=data)
+        # Одинаковая дата добавления проверяет разрешение ничьих по id.
+        created = Title.objects.first().created
+        Title.objects.filter(pk__in=Title.objects.all()[1:3]).update(
+            created=created
+        )
+        expected = list(Title.objects.values_list('pk', flat=True))
+
+        pages = self.walk(
+            client, self.TITLES_URL, {'pagination': 'cursor', 'limit': 1}
+        )
+        ids = [item['id'] for page in pages for item in page['results']]
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация `/api/v1/titles/` '
+            'возвращает каждое произведение ровно один раз в порядке '
+            'сортировки.'
+        )
+        assert pages[0]['previous'] is None
+
+        response = client.get(pages[-1]['previous'])
+        assert response.status_code == HTTPStatus.OK
+        assert [
+            item['id'] for item in response.json()['results']
+        ] == ids[-2:-1]
+
+    def test_02_limit_offset_is_default(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        assert response.json()['count'] == 2
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(self.TITLES_URL, {'cursor': 'invalid'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,44 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что поиск через `{self.TITLES_URL}?search=` '
+            'возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_is_case_insensitive(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'КРЕПКИЙ') == ['Крепкий орешек'], (
+            'Проверьте, что поиск по названию не зависит от регистра '
+            'для кириллицы.'
+        )
+        assert self.search(client, 'терминат') == ['Терминатор'], (
+            'Проверьте, что поиск находит произведения по началу слова.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек'], (
+            'Проверьте, что поиск учитывает описание произведения.'
+        )
+        assert self.search(client, '!!!') == []
+
+    def test_02_search_follows_title_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        response = admin_client.patch(url, data={'name': 'Хищник'})
+        assert response.status_code == HTTPStatus.OK
+        assert self.search(client, 'хищник') == ['Хищник']
+        assert self.search(client, 'терминатор') == []
+
+        admin_client.delete(url)
+        assert self.search(client, 'хищник') == []
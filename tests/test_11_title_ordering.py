@@ -0,0 +1,99 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_ordering(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Так себе', 3)
+        create_single_review(user_client, titles[1]['id'], 'Отлично', 9)
+
+        assert self.get_names(client, {'ordering': 'year'}) == [
+            'Терминатор', 'Крепкий орешек'
+        ], 'Проверьте сортировку произведений по году выпуска.'
+        assert self.get_names(client, {'ordering': '-rating'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте сортировку произведений по рейтингу.'
+        assert self.get_names(client, {'ordering': 'name'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте сортировку произведений по названию.'
+
+    def test_02_range_filters(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Так себе', 3)
+        create_single_review(user_client, titles[1]['id'], 'Отлично', 9)
+
+        assert self.get_names(client, {'year_min': 1985}) == [
+            'Крепкий орешек'
+        ], 'Проверьте фильтрацию произведений по минимальному году.'
+        assert self.get_names(client, {'year_max': 1985}) == [
+            'Терминатор'
+        ], 'Проверьте фильтрацию произведений по максимальному году.'
+        assert self.get_names(
+            client, {'rating_min': 5, 'genre': 'drama'}
+        ) == ['Крепкий орешек'], (
+            'Проверьте фильтрацию произведений по минимальному рейтингу.'
+        )
+        assert self.get_names(client, {'rating_max': 5}) == ['Терминатор']
+
+    def test_03_cursor_follows_ordering(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(
+            self.TITLES_URL, {'pagination': 'cursor', 'ordering': 'year'}
+        )
+        assert [
+            title['name'] for title in response.json()['results']
+        ] == ['Терминатор', 'Крепкий орешек']
+        response = client.get(
+            self.TITLES_URL, {'pagination': 'cursor', 'ordering': 'rating'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.get(
+            self.TITLES_URL,
+            {'pagination': 'cursor', 'ordering': 'year,name'}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсорная пагинация отклоняет сортировку по '
+            'нескольким полям.'
+        )
+
+    def test_04_multiple_genres_and_categories(self, client, admin_client):
+        create_titles(admin_client)
+
+        assert sorted(self.get_names(client, {'genre': 'horror,drama'})) == [
+            'Крепкий орешек', 'Терминатор'
+        ], 'Проверьте фильтрацию произведений по любому из жанров.'
+        assert self.get_names(
+            client, {'genre': 'horror,comedy', 'genre_mode': 'all'}
+        ) == ['Терминатор'], (
+            'Проверьте фильтрацию произведений по всем указанным жанрам.'
+        )
+        assert self.get_names(
+            client, {'genre': 'horror,drama', 'genre_mode': 'all'}
+        ) == []
+        assert sorted(
+            self.get_names(client, {'category': 'films,books'})
+        ) == ['Крепкий орешек', 'Терминатор']
+
+        response = client.get(self.TITLES_URL, {'genre': 'horror,comedy'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что фильтрация по нескольким жанрам не дублирует '
+            'произведения.'
+        )
+        response = client.get(self.TITLES_URL, {'genre_mode': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,52 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_repeated_get_is_cached(self, client, admin_client):
+        create_titles(admin_client)
+        first = client.get(self.TITLES_URL, {'year': 1984, 'limit': 5})
+        second = client.get(self.TITLES_URL, {'limit': 5, 'year': 1984})
+        assert first['X-Cache'] == 'MISS'
+        assert second['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный GET-запрос к `/api/v1/titles/` с теми '
+            'же параметрами в другом порядке отдаётся из кэша.'
+        )
+        assert first.json() == second.json()
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 8)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8, (
+            'Проверьте, что кэш произведения сбрасывается при создании '
+            'отзыва.'
+        )
+
+        admin_client.patch(url, data={'genre': ['drama']})
+        genres = client.get(url).json()['genre']
+        assert [genre['slug'] for genre in genres] == ['drama'], (
+            'Проверьте, что кэш произведения сбрасывается при изменении '
+            'жанров.'
+        )
+
+        client.get('/api/v1/genres/')
+        admin_client.delete('/api/v1/genres/drama/')
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert 'drama' not in [
+            genre['slug'] for genre in response.json()['results']
+        ]
+        assert client.get(url).json()['genre'] == []
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_reviews_etag(self, client, admin_client, user, user_client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = client.get(url)
+        etag = response['ETag']
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок ETag.'
+        )
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что список не отдаёт Last-Modified: удаление '
+            'записи не меняет её.'
+        )
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным ETag '
+            'возвращает ответ со статусом 304.'
+        )
+
+        response = user_client.patch(
+            f'{url}{reviews[0]["id"]}/', data={'text': 'Передумал'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов.'
+        )
+        assert response.json()['results'][0]['text'] == 'Передумал'
+
+        detail = client.get(f'{url}{reviews[0]["id"]}/')
+        response = client.get(
+            f'{url}{reviews[0]["id"]}/',
+            HTTP_IF_MODIFIED_SINCE=detail['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_02_delete_then_if_modified_since(self, client, admin_client,
+                                              user, user_client,
+                                              moderator, moderator_client):
+        reviews, titles = create_reviews(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        last_modified = client.get(
+            f'{url}{reviews[-1]["id"]}/'
+        )['Last-Modified']
+        response = admin_client.delete(f'{url}{reviews[0]["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления отзыва список с '
+            'If-Modified-Since не возвращает 304.'
+        )
+        assert reviews[0]['id'] not in {
+            review['id'] for review in response.json()['results']
+        }
+
+    def test_03_comments_etag(self, client, admin_client, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {user: user_client}
+        )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+            f'{reviews[0]["id"]}/comments/'
+        )
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+        user_client.delete(f'{url}{comments[0]["id"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0
+
+    def test_04_titles_etag(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        admin_client.patch(url, data={'name': 'Терминатор 2'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_05_list_etag_without_queries(self, client, admin_client, user,
+                                          user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url, {'pagination': 'cursor'})['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(
+                url, {'pagination': 'cursor'}, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        assert len(context) == 0, (
+            'Проверьте, что ETag списка проверяется без запросов к БД.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(
+            url, {'pagination': 'cursor'}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что переименование автора меняет ETag списка '
+            'отзывов.'
+        )
+        assert response.json()['results'][0]['author'] == 'renamed'
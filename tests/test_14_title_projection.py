@@ -0,0 +1,64 @@
+import pytest
+from rest_framework.renderers import JSONRenderer
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleProjection:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_projection_matches_model_serializer(self, client,
+                                                    admin_client,
+                                                    user_client):
+        from api.serializers import ReadTitleSerializer
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        admin_client.delete('/api/v1/categories/books/')
+
+        expected = ReadTitleSerializer(
+            Title.objects.prefetch_related('genre'), many=True
+        ).data
+        response = client.get(self.TITLES_URL)
+        assert response.content == JSONRenderer().render({
+            'count': len(expected),
+            'next': None,
+            'previous': None,
+            'results': expected,
+        }), (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'совпадает с результатом ReadTitleSerializer.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert response.content == JSONRenderer().render(
+            ReadTitleSerializer(Title.objects.get(pk=titles[0]['id'])).data
+        )
+
+    def test_02_patch_genres_as_diff(self, admin_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.patch(
+                url, data={'genre': ['comedy', 'drama']}
+            )
+        assert response.status_code == 200
+        assert [genre['slug'] for genre in response.json()['genre']] == [
+            'drama', 'comedy'
+        ]
+        genre_queries = [
+            query['sql'] for query in context.captured_queries
+            if 'reviews_genre' in query['sql']
+            or 'reviews_title_genre' in query['sql']
+        ]
+        assert len(genre_queries) == 3, (
+            'Проверьте, что жанры произведения разрешаются одним запросом, '
+            'а изменение жанров выполняется одним удалением и одной '
+            f'вставкой. Запросы: {genre_queries}'
+        )
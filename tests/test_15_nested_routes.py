@@ -0,0 +1,54 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15NestedRoutes:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_comment_post_resolves_review_once(self, admin_client,
+                                                   user, user_client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == HTTPStatus.CREATED
+        review_lookups = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ]
+        assert len(review_lookups) == 1, (
+            'Проверьте, что при создании комментария отзыв и произведение '
+            f'проверяются одним запросом. Запросы: {review_lookups}'
+        )
+
+    def test_02_parent_chain_is_validated(self, client, admin_client,
+                                          user, user_client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        )
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарии отзыва, относящегося к другому '
+            'произведению, возвращают ответ со статусом 404.'
+        )
+        response = user_client.post(url, data={'text': 'Согласен'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 0
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+from rest_framework.test import APIClient
+
+from api.authentication import ClaimsAccessToken
+from api.cache import get_cache
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ReviewUpsert:
+
+    MINE_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/mine/'
+
+    def test_01_duplicate_review_is_bad_request(self, admin_client,
+                                                user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв на произведение возвращает '
+            'ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': [
+                'Нельзя сделать 2 отзыва на одно произведение!'
+            ]
+        }
+
+    def test_02_upsert(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.MINE_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        data = {'text': 'Неплохо', 'score': 6}
+
+        assert client.put(url, data=data).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+        response = user_client.put(url, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что первый PUT-запрос к `{url}` создаёт отзыв и '
+            'возвращает ответ со статусом 201.'
+        )
+        review_id = response.json()['id']
+
+        response = user_client.put(url, data={'text': 'Отлично', 'score': 9})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что повторный PUT-запрос к `{url}` заменяет отзыв '
+            'и возвращает ответ со статусом 200.'
+        )
+        assert response.json()['id'] == review_id
+        assert response.json()['text'] == 'Отлично'
+
+        title = client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert title['rating'] == 9
+
+        response = user_client.put(
+            self.MINE_URL_TEMPLATE.format(title_id=999), data=data
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = user_client.put(url, data={'score': 5})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_other_integrity_errors_are_not_duplicates(self, admin_client,
+                                                         user):
+        titles, _, _ = create_titles(admin_client)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+        )
+        user.delete()
+        # Пользователь удалён уже после аутентификации запроса.
+        get_cache().clear()
+        with pytest.raises(IntegrityError):
+            client.post(
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+                data={'text': 'Отзыв', 'score': 5}
+            )
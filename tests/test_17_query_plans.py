@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+
+from tests.utils import check_query_plans, create_comments
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='EXPLAIN QUERY PLAN разбирается в формате SQLite'
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17QueryPlans:
+
+    def test_01_list_endpoints_use_indexes(self, client, admin_client,
+                                           admin, user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?ordering=-rating',
+            '/api/v1/titles/?category=films&year_min=1980',
+            '/api/v1/titles/?pagination=cursor',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/?pagination=cursor',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+            '?pagination=cursor',
+            f'/api/v1/titles/{title_id}/reviews/export/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/export/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            check_query_plans(client, url)
+        for url in (
+            '/api/v1/reviews/export/?since=2020-01-01T00:00:00Z',
+            '/api/v1/comments/export/?since=2020-01-01T00:00:00Z',
+            '/api/v1/users/',
+        ):
+            check_query_plans(admin_client, url)
@@ -0,0 +1,129 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_single_comment
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18CommentCounters:
+
+    REVIEW_LIST_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/'
+    )
+
+    def get_reviews(self, client, title_id):
+        response = client.get(
+            self.REVIEW_LIST_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return {
+            review['id']: review for review in response.json()['results']
+        }, response
+
+    def get_comment_dates(self, client, title_id, review_id):
+        response = client.get(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ) + 'comments/'
+        )
+        return {
+            comment['id']: comment['pub_date']
+            for comment in response.json()['results']
+        }
+
+    def test_01_counters_follow_comments(self, admin_client, admin,
+                                         user_client, user,
+                                         moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        review_id = reviews[0]['id']
+        dates = self.get_comment_dates(admin_client, title_id, review_id)
+
+        data, _ = self.get_reviews(admin_client, title_id)
+        assert data[review_id]['comments_count'] == len(comments), (
+            'Проверьте, что поле `comments_count` отзыва учитывает '
+            'созданные комментарии.'
+        )
+        assert data[review_id]['last_comment_at'] == (
+            dates[comments[-1]['id']]
+        ), (
+            'Проверьте, что поле `last_comment_at` отзыва содержит дату '
+            'последнего комментария.'
+        )
+        assert data[reviews[1]['id']]['comments_count'] == 0
+        assert data[reviews[1]['id']]['last_comment_at'] is None, (
+            'Проверьте, что у отзыва без комментариев поле '
+            '`last_comment_at` равно None.'
+        )
+
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ),
+            data={'text': 'Новый текст'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['comments_count'] == len(comments), (
+            'Проверьте, что изменение отзыва не сбрасывает счётчик '
+            'комментариев.'
+        )
+
+        response = moderator_client.delete(
+            self.COMMENT_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id,
+                review_id=review_id,
+                comment_id=comments[-1]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data, _ = self.get_reviews(admin_client, title_id)
+        assert data[review_id]['comments_count'] == len(comments) - 1, (
+            'Проверьте, что удаление комментария уменьшает поле '
+            '`comments_count` отзыва.'
+        )
+        assert data[review_id]['last_comment_at'] == (
+            dates[comments[-2]['id']]
+        ), (
+            'Проверьте, что после удаления последнего комментария поле '
+            '`last_comment_at` содержит дату предыдущего.'
+        )
+
+    def test_02_review_list_queries_do_not_grow(self, admin_client, admin,
+                                                user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        with CaptureQueriesContext(connection) as before:
+            _, response = self.get_reviews(admin_client, title_id)
+        etag = response['ETag']
+
+        for idx in range(5):
+            create_single_comment(
+                user_client, title_id, reviews[1]['id'], f'comment {idx}'
+            )
+        response = admin_client.get(
+            self.REVIEW_LIST_URL_TEMPLATE.format(title_id=title_id),
+            HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов.'
+        )
+        with CaptureQueriesContext(connection) as after:
+            data, _ = self.get_reviews(admin_client, title_id)
+        assert data[reviews[1]['id']]['comments_count'] == 5
+        assert len(after) == len(before), (
+            'Проверьте, что количество запросов к БД для списка отзывов '
+            'не зависит от количества комментариев.'
+        )
@@ -0,0 +1,86 @@
+import pytest
+
+from api.middleware import clear_reports, get_fingerprint, get_reports
+from api.views import ReviewViewSet
+from reviews.models import Review
+from tests.utils import create_comments
+
+
+@pytest.fixture
+def detector(settings):
+    settings.N_PLUS_ONE_SAMPLE_RATE = 1
+    settings.N_PLUS_ONE_THRESHOLD = 3
+    clear_reports()
+    yield get_reports
+    clear_reports()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19NPlusOneDetector:
+
+    def create_data(self, admin_client, admin, user_client, user,
+                    moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, reviews, titles = create_comments(admin_client, author_map)
+        return titles[0]['id'], reviews[0]['id']
+
+    def test_01_fingerprint_ignores_values(self):
+        assert get_fingerprint(
+            "SELECT * FROM t WHERE id = 1 AND name = 'a''b' LIMIT 10"
+        ) == get_fingerprint(
+            "SELECT * FROM t WHERE id = 25 AND name = 'c' LIMIT 20"
+        ), (
+            'Проверьте, что отпечаток запроса не зависит от значений '
+            'параметров.'
+        )
+        assert get_fingerprint(
+            'SELECT * FROM t WHERE id IN (%s, %s, %s)'
+        ) == get_fingerprint('SELECT * FROM t WHERE id IN (%s)'), (
+            'Проверьте, что отпечаток запроса не зависит от длины списка IN.'
+        )
+
+    def test_02_detects_missing_select_related(self, client, detector,
+                                               monkeypatch, admin_client,
+                                               admin, user_client, user,
+                                               moderator_client, moderator):
+        title_id, _ = self.create_data(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator
+        )
+        clear_reports()
+        monkeypatch.setattr(ReviewViewSet, 'queryset', Review.objects.all())
+        client.get(f'/api/v1/titles/{title_id}/reviews/')
+        fields = {field for _, field, _ in detector()}
+        assert 'ReviewSerializer.author' in fields, (
+            'Проверьте, что middleware находит повторяющиеся запросы '
+            'автора отзыва и указывает поле сериализатора.'
+        )
+
+    def test_03_api_endpoints_have_no_n_plus_one(self, client, detector,
+                                                 admin_client, admin,
+                                                 user_client, user,
+                                                 moderator_client,
+                                                 moderator):
+        title_id, review_id = self.create_data(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator
+        )
+        clear_reports()
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            client.get(url)
+        admin_client.get('/api/v1/users/')
+        assert detector() == {}, (
+            'Проверьте, что эндпоинты API не выполняют N+1 запросов.'
+        )
@@ -0,0 +1,164 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20ReviewBatch:
+
+    BATCH_URL = '/api/v1/reviews/batch/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def post(self, client, data):
+        return client.post(
+            self.BATCH_URL, data=json.dumps(data),
+            content_type='application/json'
+        )
+
+    def test_01_only_admin(self, client, user_client):
+        response = self.post(client, [])
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что пакетная загрузка отзывов недоступна '
+            'неавторизованному пользователю.'
+        )
+        response = self.post(user_client, [])
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пакетная загрузка отзывов доступна только '
+            'администратору.'
+        )
+
+    def test_02_creates_reviews_and_ratings(self, admin_client, admin,
+                                            user, moderator):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        data = [
+            {'title': first, 'author': admin.username, 'text': 'a',
+             'score': 10},
+            {'title': first, 'author': user.username, 'text': 'b',
+             'score': 4},
+            {'title': second, 'author': moderator.username, 'text': 'c',
+             'score': 3},
+        ]
+        response = self.post(admin_client, data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что пакетная загрузка отзывов возвращает 201.'
+        )
+        assert response.json() == {
+            'created': 3, 'titles': sorted([first, second])
+        }
+        assert Review.objects.count() == 3
+        for title_id, rating in ((first, 7), (second, 3)):
+            response = admin_client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+            )
+            assert response.json()['rating'] == rating, (
+                'Проверьте, что после пакетной загрузки пересчитывается '
+                'рейтинг произведений.'
+            )
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=first)
+            + 'rating-histogram/'
+        )
+        assert response.json()['histogram']['4'] == 1
+
+    def test_03_per_item_errors(self, admin_client, admin, user,
+                                moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'existing', 5)
+        data = [
+            {'title': title_id, 'author': user.username, 'text': 'ok',
+             'score': 5},
+            {'title': 999999, 'author': user.username, 'text': 'no title',
+             'score': 5},
+            {'title': title_id, 'author': 'nobody', 'text': 'no author',
+             'score': 5},
+            {'title': title_id, 'author': admin.username, 'text': 'dup',
+             'score': 5},
+            {'title': title_id, 'author': user.username, 'text': 'dup',
+             'score': 5},
+            {'title': title_id, 'author': moderator.username, 'text': 'x',
+             'score': 11},
+        ]
+        response = self.post(admin_client, data)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == len(data), (
+            'Проверьте, что ошибки пакетной загрузки возвращаются списком '
+            'по каждому отзыву.'
+        )
+        assert errors[0] == {}
+        assert 'title' in errors[1]
+        assert 'author' in errors[2]
+        assert 'non_field_errors' in errors[3], (
+            'Проверьте, что пакетная загрузка отклоняет отзыв автора на '
+            'произведение, у которого уже есть его отзыв.'
+        )
+        assert 'non_field_errors' in errors[4], (
+            'Проверьте, что пакетная загрузка отклоняет повтор отзыва '
+            'внутри пакета.'
+        )
+        assert 'score' in errors[5]
+        assert Review.objects.count() == 1, (
+            'Проверьте, что при ошибках в пакете не сохраняется ни один '
+            'отзыв.'
+        )
+
+    def test_04_queries_do_not_grow(self, admin_client, django_user_model):
+        titles, _, _ = create_titles(admin_client)
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'partner{idx}', email=f'partner{idx}@yamdb.fake'
+            )
+            for idx in range(20)
+        ]
+
+        def batch(start, stop):
+            return [
+                {'title': title['id'], 'author': author.username,
+                 'text': 'text', 'score': 5}
+                for author in authors[start:stop]
+                for title in titles
+            ]
+
+        with CaptureQueriesContext(connection) as small:
+            response = self.post(admin_client, batch(0, 1))
+        assert response.status_code == HTTPStatus.CREATED
+        with CaptureQueriesContext(connection) as large:
+            response = self.post(admin_client, batch(1, 20))
+        assert response.status_code == HTTPStatus.CREATED
+        assert len(large) == len(small), (
+            'Проверьте, что количество запросов пакетной загрузки не '
+            'зависит от числа отзывов в пакете.'
+        )
+
+    def test_05_reviewed_filtered_by_authors(self, admin_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'existing', 5)
+        data = [
+            {'title': title_id, 'author': user.username, 'text': 'a',
+             'score': 5},
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = self.post(admin_client, data)
+        assert response.status_code == HTTPStatus.CREATED
+        reviewed = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(
+                'SELECT "reviews_review"."title_id", '
+                '"reviews_review"."author_id"'
+            )
+        ]
+        assert len(reviewed) == 1 and (
+            '"reviews_review"."author_id" IN' in reviewed[0]
+        ), (
+            'Проверьте, что пакетная загрузка проверяет повторы только '
+            'для авторов из пакета.'
+        )
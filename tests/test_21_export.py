@@ -0,0 +1,145 @@
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Export:
+
+    REVIEWS_EXPORT_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/export/'
+    COMMENTS_EXPORT_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/export/'
+    )
+
+    def create_data(self, admin_client, admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        return create_comments(admin_client, author_map)
+
+    def get_rows(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+        assert response.streaming, (
+            f'Проверьте, что `{url}` отдаёт выгрузку потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        content = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_01_nested_exports(self, client, admin_client, admin,
+                               user_client, user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        title_id = titles[0]['id']
+        rows = self.get_rows(
+            client, self.REVIEWS_EXPORT_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews
+        ], (
+            'Проверьте, что выгрузка отзывов содержит все отзывы на '
+            'произведение в порядке публикации.'
+        )
+        assert rows[0]['author'] == admin.username
+        assert rows[0]['title_id'] == title_id
+        assert set(rows[0]) == {
+            'id', 'title_id', 'author', 'text', 'score', 'pub_date'
+        }
+
+        rows = self.get_rows(
+            client,
+            self.COMMENTS_EXPORT_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert [row['id'] for row in rows] == [
+            comment['id'] for comment in comments
+        ], 'Проверьте, что выгрузка комментариев содержит все комментарии.'
+
+        response = client.get(
+            self.REVIEWS_EXPORT_URL_TEMPLATE.format(title_id=999999)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что выгрузка отзывов несуществующего произведения '
+            'возвращает 404.'
+        )
+
+    def test_02_since(self, admin_client, admin, user_client,
+                      user):
+        _, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        rows = self.get_rows(admin_client, '/api/v1/reviews/export/')
+        assert len(rows) == len(reviews), (
+            'Проверьте, что `/api/v1/reviews/export/` выгружает все отзывы.'
+        )
+        since = rows[-1]['pub_date']
+        rows = self.get_rows(
+            admin_client, f'/api/v1/reviews/export/?since={since}'
+        )
+        assert [row['id'] for row in rows] == [reviews[-1]['id']], (
+            'Проверьте, что параметр `since` оставляет записи, '
+            'опубликованные не раньше указанной даты.'
+        )
+        rows = self.get_rows(
+            admin_client, '/api/v1/comments/export/?since=2999-01-01T00:00:00Z'
+        )
+        assert rows == []
+        response = admin_client.get(
+            '/api/v1/reviews/export/?since=yesterday'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный `since` возвращает 400.'
+        )
+
+    def test_03_management_command(self, admin_client, admin,
+                                   user_client, user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        out = StringIO()
+        call_command(
+            'export_ndjson', 'comments', title=titles[0]['id'],
+            chunk_size=1, stdout=out
+        )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert [row['id'] for row in rows] == [
+            comment['id'] for comment in comments
+        ], (
+            'Проверьте, что команда export_ndjson выгружает комментарии '
+            'к отзывам на произведение.'
+        )
+        assert rows[0]['title_id'] == titles[0]['id']
+
+    def test_04_catalogue_exports_only_admin(self, client, user_client):
+        for url in ('/api/v1/reviews/export/', '/api/v1/comments/export/'):
+            assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+            assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                f'Проверьте, что `{url}` доступна только администратору.'
+            )
+
+    def test_05_exports_throttled(self, client, admin_client, admin,
+                                  user_client, user, settings):
+        _, _, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'export.ip': '1/min'},
+        }
+        url = self.REVIEWS_EXPORT_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).status_code == HTTPStatus.OK
+        assert client.get(url).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), f'Проверьте, что выгрузка `{url}` ограничена по частоте.'
+        list_url = url.replace('export/', '')
+        assert client.get(list_url).status_code == HTTPStatus.OK, (
+            'Проверьте, что чтение отзывов не ограничивается.'
+        )
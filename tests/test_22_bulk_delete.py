@@ -0,0 +1,203 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.deletion import delete_user, get_user_cascade_size
+from reviews.models import Comment, Review, ScoreBucket, Title
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22BulkDelete:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def create_data(self, admin_client, admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        return create_comments(admin_client, author_map)
+
+    def wait_for_job(self, admin_client, url):
+        for _ in range(100):
+            response = admin_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            job = response.json()
+            if job['status'] in ('done', 'failed'):
+                return job
+            time.sleep(0.05)
+        raise AssertionError('Фоновое удаление не завершилось.')
+
+    def test_01_title_sync(self, admin_client, admin, user_client, user):
+        _, _, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        title_id = titles[0]['id']
+        response = admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            'Проверьте, что небольшое произведение удаляется сразу '
+            'с ответом 204.'
+        )
+        assert not Title.objects.filter(pk=title_id).exists()
+        assert not Review.objects.exists()
+        assert not Comment.objects.exists()
+        assert not ScoreBucket.objects.filter(title_id=title_id).exists()
+
+    def test_02_title_background(self, settings, admin_client, admin,
+                                 user_client, user):
+        settings.BULK_DELETE_SYNC_LIMIT = 0
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        title_id = titles[0]['id']
+        response = admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.ACCEPTED, (
+            'Проверьте, что произведение с большим количеством отзывов '
+            'удаляется в фоне с ответом 202.'
+        )
+        url = response.json()['url']
+        assert response['Location'] == url
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что статус фоновой задачи доступен только '
+            'администратору.'
+        )
+        job = self.wait_for_job(admin_client, url)
+        assert job['status'] == 'done'
+        assert job['result'] == {
+            'reviews': len(reviews), 'comments': len(comments), 'titles': 1
+        }
+        response = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после фонового удаления произведение '
+            'недоступно.'
+        )
+        response = admin_client.get('/api/v1/jobs/unknown/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_user_keeps_counters(self, admin_client, admin,
+                                    user_client, user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        create_single_review(user_client, titles[1]['id'], 'second', 1)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.filter(author=user).exists()
+        assert not Comment.objects.filter(author=user).exists()
+
+        admin_review = Review.objects.get(pk=reviews[0]['id'])
+        assert admin_review.comments_count == 1, (
+            'Проверьте, что удаление пользователя уменьшает счётчик '
+            'комментариев у чужих отзывов.'
+        )
+        first = Title.objects.get(pk=titles[0]['id'])
+        second = Title.objects.get(pk=titles[1]['id'])
+        assert (first.score_count, first.rating) == (1, 5), (
+            'Проверьте, что удаление пользователя обновляет рейтинг '
+            'произведений, на которые он оставлял отзывы.'
+        )
+        assert (second.score_count, second.rating) == (0, None)
+        assert not ScoreBucket.objects.filter(
+            title=second, count__gt=0
+        ).exists()
+
+    def test_04_batches_keep_counters(self, admin_client, admin,
+                                      user_client, user):
+        _, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        for title in titles[1:]:
+            create_single_review(user_client, title['id'], 'text', 3)
+        result = delete_user(user.pk, batch_size=1)
+        assert result == {
+            'reviews': len(titles), 'comments': 1, 'users': 1
+        }
+        shifted = {
+            title.pk: (title.score_sum, title.score_count, title.rating)
+            for title in Title.objects.all()
+        }
+        Title.objects.recount_scores()
+        assert shifted == {
+            title.pk: (title.score_sum, title.score_count, title.rating)
+            for title in Title.objects.all()
+        }, (
+            'Проверьте, что пакетное удаление оставляет счётчики оценок '
+            'согласованными с отзывами.'
+        )
+
+    def test_05_user_cascade_size(self, admin_client, admin, user_client,
+                                  user):
+        _, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        create_single_comment(
+            admin_client, titles[0]['id'], reviews[1]['id'], 'admin'
+        )
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[1]['id'], 'own'
+        )
+        assert get_user_cascade_size(user.pk) == 4, (
+            'Проверьте, что размер каскада пользователя учитывает чужие '
+            'комментарии к его отзывам.'
+        )
+        assert delete_user(user.pk) == {
+            'reviews': 1, 'comments': 3, 'users': 1
+        }
+
+    def test_06_user_delete_resets_cache(self, client, admin_client, admin,
+                                         user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        create_single_comment(
+            user_client, titles[0]['id'], reviews[0]['id'], 'comment'
+        )
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        ) + '?include=reviews'
+        client.get(url)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что удаление пользователя сбрасывает кэш ответов '
+            'с отзывами и комментариями.'
+        )
+        assert [
+            (review['id'], review['comments_count'])
+            for review in response.json()['reviews']
+        ] == [(reviews[0]['id'], 1)]
+
+    def test_07_review_delete_queries(self, admin_client, admin,
+                                      user_client, user):
+        _, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        title_id = titles[0]['id']
+        for idx in range(20):
+            create_single_comment(
+                user_client, title_id, reviews[1]['id'], f'comment {idx}'
+            )
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        queries = []
+        for review in reviews:
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.delete(
+                    f'{url}reviews/{review["id"]}/'
+                )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+            queries.append(len(context))
+        assert queries[0] == queries[1], (
+            'Проверьте, что число запросов при удалении отзыва не зависит '
+            'от количества комментариев к нему.'
+        )
+        assert not Comment.objects.exists()
+        assert Title.objects.get(pk=title_id).rating is None
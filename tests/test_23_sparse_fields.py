@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23SparseFields:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+        return response.json(), [query['sql'] for query in context]
+
+    def create_data(self, admin_client, admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        return create_comments(admin_client, author_map)
+
+    def test_01_titles(self, client, admin_client, admin, user_client,
+                       user):
+        self.create_data(admin_client, admin, user_client, user)
+        data, queries = self.get(
+            client, '/api/v1/titles/?fields=id,name,rating'
+        )
+        assert all(
+            list(title) == ['id', 'name', 'rating']
+            for title in data['results']
+        ), (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        sql = '\n'.join(queries)
+        assert 'reviews_genre' not in sql, (
+            'Проверьте, что жанры не запрашиваются, если поле `genre` не '
+            'выбрано.'
+        )
+        assert 'description' not in sql and 'reviews_category' not in sql, (
+            'Проверьте, что queryset сужается до колонок выбранных полей.'
+        )
+
+        data, _ = self.get(client, '/api/v1/titles/?omit=description,genre')
+        assert list(data['results'][0]) == [
+            'id', 'name', 'year', 'rating', 'category'
+        ], 'Проверьте, что параметр `omit` убирает поля из ответа.'
+
+        title_id = data['results'][0]['id']
+        data, _ = self.get(client, f'/api/v1/titles/{title_id}/?fields=id')
+        assert data == {'id': title_id}
+
+        response = client.get('/api/v1/titles/?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` возвращает 400.'
+        )
+
+    def test_02_reviews_and_comments(self, client, admin_client, admin,
+                                     user_client, user):
+        _, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data, queries = self.get(client, url + '?fields=id,score,author')
+        assert data['results'][0] == {
+            'id': reviews[-1]['id'], 'score': 5, 'author': user.username
+        }
+        select = [sql for sql in queries if 'FROM "reviews_review"' in sql]
+        assert '"reviews_review"."text"' not in select[-1], (
+            'Проверьте, что текст отзыва не читается из БД, если поле '
+            '`text` не выбрано.'
+        )
+        assert len(queries) == len(self.get(client, url)[1]), (
+            'Проверьте, что выбор полей не добавляет запросов к БД.'
+        )
+
+        data, queries = self.get(client, url + '?fields=id,score')
+        assert 'users_user' not in '\n'.join(queries), (
+            'Проверьте, что автор не присоединяется, если поле `author` не '
+            'выбрано.'
+        )
+
+        data, _ = self.get(
+            client, url + '?fields=id&pagination=cursor&limit=1'
+        )
+        assert data['results'] == [{'id': reviews[-1]['id']}]
+        data, _ = self.get(client, data['next'])
+        assert data['results'] == [{'id': reviews[0]['id']}], (
+            'Проверьте, что курсорная пагинация работает с параметром '
+            '`fields`.'
+        )
+
+        data, _ = self.get(
+            client, url + f'{reviews[0]["id"]}/comments/?omit=text,pub_date'
+        )
+        assert set(data['results'][0]) == {'id', 'author'}
+
+    def test_03_other_viewsets(self, client, admin_client, admin):
+        self.create_data(admin_client, admin, admin_client, admin)
+        data, _ = self.get(client, '/api/v1/categories/?fields=slug')
+        assert all(list(item) == ['slug'] for item in data['results'])
+        data, _ = self.get(client, '/api/v1/genres/?omit=slug')
+        assert all(list(item) == ['name'] for item in data['results'])
+        data, _ = self.get(admin_client, '/api/v1/users/?fields=username')
+        assert data['results'] == [{'username': admin.username}]
+
+    def test_04_empty_selection(self, client, admin_client, admin):
+        self.create_data(admin_client, admin, admin_client, admin)
+        data, _ = self.get(
+            client,
+            '/api/v1/titles/?omit=id,name,year,rating,description,genre,'
+            'category'
+        )
+        assert data['results'] and all(
+            item == {} for item in data['results']
+        ), (
+            'Проверьте, что `omit` со всеми полями возвращает пустые '
+            'объекты, а не все поля.'
+        )
+        data, _ = self.get(client, '/api/v1/genres/?omit=name,slug')
+        assert all(item == {} for item in data['results'])
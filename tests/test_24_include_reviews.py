@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_reviews, create_single_comment,
+                         create_single_review)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24IncludeReviews:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает статус 200.'
+        )
+        return response.json(), len(context)
+
+    def create_data(self, admin_client, admin, user_client, user,
+                    moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        create_single_review(user_client, titles[1]['id'], 'second', 7)
+        return reviews, titles
+
+    def test_01_list(self, client, admin_client, admin, user_client, user,
+                     moderator_client, moderator):
+        reviews, titles = self.create_data(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator
+        )
+        _, plain_queries = self.get(client, self.TITLES_URL + '?limit=20')
+        data, queries = self.get(
+            client, self.TITLES_URL + '?limit=20&include=reviews[:2]'
+        )
+        assert queries == plain_queries + 1, (
+            'Проверьте, что встроенные отзывы всех произведений страницы '
+            'загружаются одним дополнительным запросом.'
+        )
+        included = {
+            title['id']: title['reviews'] for title in data['results']
+        }
+        assert [review['id'] for review in included[titles[0]['id']]] == [
+            reviews[2]['id'], reviews[1]['id']
+        ], (
+            'Проверьте, что встраиваются N последних отзывов на '
+            'произведение.'
+        )
+        assert len(included[titles[1]['id']]) == 1, (
+            'Проверьте, что отзывы встраиваются в каждое произведение '
+            'страницы.'
+        )
+        assert set(included[titles[0]['id']][0]) == {
+            'id', 'text', 'author', 'score', 'pub_date', 'comments_count',
+            'last_comment_at'
+        }, 'Проверьте, что встроенный отзыв совпадает с ответом /reviews/.'
+
+    def test_02_retrieve_and_fields(self, client, admin_client, admin,
+                                    user_client, user, moderator_client,
+                                    moderator):
+        reviews, titles = self.create_data(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator
+        )
+        title_id = titles[0]['id']
+        url = f'{self.TITLES_URL}{title_id}/?include=reviews'
+        data, _ = self.get(client, url)
+        assert len(data['reviews']) == len(reviews)
+
+        create_single_comment(
+            user_client, title_id, reviews[0]['id'], 'comment'
+        )
+        data, _ = self.get(client, url)
+        assert data['reviews'][-1]['comments_count'] == 1, (
+            'Проверьте, что кэш ответа со встроенными отзывами '
+            'сбрасывается при новом комментарии.'
+        )
+
+        data, _ = self.get(client, url + '[:1]&fields=id')
+        assert data == {
+            'id': title_id,
+            'reviews': [
+                self.get(
+                    client,
+                    f'{self.TITLES_URL}{title_id}/reviews/{reviews[2]["id"]}/'
+                )[0]
+            ]
+        }
+
+    def test_03_omit_id(self, client, admin_client, admin, user_client,
+                        user, moderator_client, moderator):
+        reviews, titles = self.create_data(
+            admin_client, admin, user_client, user, moderator_client,
+            moderator
+        )
+        data, _ = self.get(
+            client,
+            self.TITLES_URL + '?limit=20&omit=id&include=reviews[:1]'
+        )
+        included = {
+            title['name']: title['reviews'] for title in data['results']
+        }
+        assert all('id' not in title for title in data['results'])
+        assert [review['id'] for review in included[titles[0]['name']]] == [
+            reviews[2]['id']
+        ], (
+            'Проверьте, что отзывы встраиваются и без поля `id` в ответе.'
+        )
+
+    def test_04_author_rename(self, client, admin_client, user,
+                              user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/?include=reviews'
+        client.get(url)
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что переименование автора сбрасывает кэш ответов '
+            'со встроенными отзывами.'
+        )
+        assert response.json()['reviews'][0]['author'] == 'renamed'
+
+    @pytest.mark.parametrize(
+        'include', ('comments', 'reviews[:0]', 'reviews[:21]', 'reviews[5]')
+    )
+    def test_05_invalid(self, client, include):
+        response = client.get(f'{self.TITLES_URL}?include={include}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что некорректный параметр `include` возвращает 400.'
+        )
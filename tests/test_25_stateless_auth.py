@@ -0,0 +1,124 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import ClaimsAccessToken
+
+
+def get_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+def get_user_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if '"users_user"' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25StatelessAuth:
+
+    CATEGORIES_URL = '/api/v1/categories/'
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_token_contains_claims(self, client, admin):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': admin.username,
+            'confirmation_code': default_token_generator.make_token(admin)
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == 'admin'
+        assert token['is_superuser'] is False
+        assert token['is_staff'] is False, (
+            'Проверьте, что токен из `/api/v1/auth/token/` содержит роль '
+            'и флаги пользователя.'
+        )
+
+    def test_02_no_user_query(self, admin):
+        client = get_client(ClaimsAccessToken.for_user(admin))
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(
+                self.CATEGORIES_URL, data={'name': 'Фильм', 'slug': 'films'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert get_user_queries(context.captured_queries) == [], (
+            'Проверьте, что запрос с токеном, содержащим роль, не загружает '
+            'пользователя из БД.'
+        )
+
+    def test_03_lazy_user_fields(self, user):
+        client = get_client(ClaimsAccessToken.for_user(user))
+        response = client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['bio'] == user.bio, (
+            'Проверьте, что поля пользователя, которых нет в токене, '
+            'загружаются из БД.'
+        )
+        response = client.patch(self.ME_URL, data={'bio': 'Новое'})
+        assert response.status_code == HTTPStatus.OK
+        user.refresh_from_db()
+        assert user.bio == 'Новое'
+
+    def test_04_role_change_after_claims_expire(self, settings, admin):
+        settings.JWT_CLAIMS_LIFETIME = timedelta(0)
+        client = get_client(ClaimsAccessToken.for_user(admin))
+        data = {'name': 'Фильм', 'slug': 'films'}
+        assert client.post(self.CATEGORIES_URL, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        admin.role = 'user'
+        admin.save()
+        response = client.post(
+            self.CATEGORIES_URL, data={'name': 'Книга', 'slug': 'books'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после окончания JWT_CLAIMS_LIFETIME токен '
+            'получает новую роль пользователя.'
+        )
+
+    def test_05_claims_are_cached(self, settings, admin):
+        settings.JWT_CLAIMS_LIFETIME = timedelta(0)
+        client = get_client(ClaimsAccessToken.for_user(admin))
+        settings.JWT_CLAIMS_LIFETIME = timedelta(minutes=5)
+        client.get(self.CATEGORIES_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert get_user_queries(context.captured_queries) == [], (
+            'Проверьте, что устаревшая роль перечитывается из БД не на '
+            'каждый запрос.'
+        )
+
+    def test_06_deleted_user(self, settings, admin_client, user):
+        settings.JWT_CLAIMS_LIFETIME = timedelta(0)
+        client = get_client(ClaimsAccessToken.for_user(user))
+        assert client.get(self.ME_URL).status_code == HTTPStatus.OK
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+
+    def test_07_deactivated_user(self, admin):
+        client = get_client(ClaimsAccessToken.for_user(admin))
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        admin.is_active = False
+        admin.save()
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что токен деактивированного пользователя не '
+            'принимается, даже если роль в нём ещё не устарела.'
+        )
@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+
+from api import mail as mail_queue
+from api.mail import EmailQueue, EmailQueueFull
+
+FLAKY_BACKEND = 'tests.test_26_mail_queue.FlakyBackend'
+
+
+class FlakyBackend(EmailBackend):
+    """Бэкенд, отклоняющий первые failures отправок."""
+
+    failures = 0
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise ConnectionError
+        return super().send_messages(messages)
+
+
+def get_message(number=0):
+    return EmailMessage(
+        'Код подтверждения', f'Код {number}', 'webmaster@localhost',
+        [f'user{number}@yamdb.fake']
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26MailQueue:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_does_not_wait_for_mail(self, client, settings,
+                                              monkeypatch):
+        settings.EMAIL_QUEUE_EAGER = False
+        queue = EmailQueue(workers=1)
+        monkeypatch.setattr(mail_queue, '_queue', queue)
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.OK
+        assert queue.flush(5)
+        assert [message.to for message in mail.outbox] == [
+            ['valid@yamdb.fake']
+        ], (
+            'Проверьте, что письмо с кодом подтверждения отправляется '
+            'через очередь.'
+        )
+        stats = queue.get_stats()
+        assert stats['queued'] == stats['sent'] == 1
+        assert stats['depth'] == 0
+
+    def test_02_batch_uses_one_connection(self):
+        queue = EmailQueue(workers=1, batch_size=10)
+        for number in range(5):
+            queue.queue.put((0, get_message(number)))
+        queue.start()
+        assert queue.flush(5)
+        assert len(mail.outbox) == 5
+        assert queue.get_stats()['batches'] == 1, (
+            'Проверьте, что письма из очереди отправляются пакетом через '
+            'одно соединение.'
+        )
+
+    def test_03_retry(self, settings):
+        settings.EMAIL_BACKEND = FLAKY_BACKEND
+        FlakyBackend.failures = 2
+        queue = EmailQueue(workers=1, retries=2, backoff=0)
+        queue.put(get_message())
+        assert queue.flush(5)
+        stats = queue.get_stats()
+        assert (stats['sent'], stats['retried'], stats['failed']) == (
+            1, 2, 0
+        ), 'Проверьте, что неудачная отправка повторяется.'
+        assert len(mail.outbox) == 1
+
+    def test_04_failed_after_retries(self, settings):
+        settings.EMAIL_BACKEND = FLAKY_BACKEND
+        FlakyBackend.failures = 3
+        queue = EmailQueue(workers=1, retries=1, backoff=0)
+        queue.put(get_message())
+        assert queue.flush(5)
+        stats = queue.get_stats()
+        FlakyBackend.failures = 0
+        assert (stats['sent'], stats['failed']) == (0, 1), (
+            'Проверьте, что письмо считается неотправленным после всех '
+            'повторов.'
+        )
+
+    def test_05_backpressure(self, client, settings, monkeypatch):
+        settings.EMAIL_QUEUE_EAGER = False
+        settings.EMAIL_QUEUE_TIMEOUT = 0
+        queue = EmailQueue(maxsize=1, workers=0)
+        queue.put(get_message(), timeout=0)
+        with pytest.raises(EmailQueueFull):
+            queue.put(get_message(1), timeout=0)
+        monkeypatch.setattr(mail_queue, '_queue', queue)
+        response = client.post(self.URL_SIGNUP, data={
+            'email': 'valid@yamdb.fake', 'username': 'valid_username'
+        })
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            'Проверьте, что при заполненной очереди писем регистрация '
+            'возвращает ответ со статусом 503.'
+        )
+        stats = queue.get_stats()
+        assert (stats['depth'], stats['rejected']) == (1, 2)
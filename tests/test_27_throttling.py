@@ -0,0 +1,138 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import IPSlidingWindowThrottle, SlidingWindowThrottle
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    def set_rates(**rates):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                scope.replace('_', '.'): rate for scope, rate in rates.items()
+            },
+        }
+    return set_rates
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(SlidingWindowThrottle, 'timer', lambda self: now[0])
+    return now
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_throttled_before_db(self, client, throttle_rates,
+                                           clock):
+        throttle_rates(signup_ip='2/min')
+        for _ in range(2):
+            response = client.post(self.URL_SIGNUP)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_SIGNUP)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            f'Проверьте, что запросы к `{self.URL_SIGNUP}` сверх лимита '
+            'возвращают ответ со статусом 429.'
+        )
+        assert response['Retry-After'] == '50', (
+            'Проверьте, что ответ 429 содержит заголовок Retry-After со '
+            'временем до следующего разрешённого запроса.'
+        )
+        assert context.captured_queries == [], (
+            'Проверьте, что лимит проверяется до обращения к БД.'
+        )
+
+    def test_02_window_slides(self, client, throttle_rates, clock):
+        throttle_rates(signup_ip='2/min')
+        for _ in range(2):
+            client.post(self.URL_SIGNUP)
+        response = client.post(self.URL_SIGNUP)
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        clock[0] += int(response['Retry-After']) - 1
+        assert client.post(self.URL_SIGNUP).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        clock[0] += 1
+        assert client.post(self.URL_SIGNUP).status_code == (
+            HTTPStatus.BAD_REQUEST
+        ), 'Проверьте, что после Retry-After запрос снова разрешён.'
+        assert client.post(self.URL_SIGNUP).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_03_counters_per_ip(self, client, throttle_rates, clock):
+        throttle_rates(signup_ip='1/min')
+        client.post(self.URL_SIGNUP, REMOTE_ADDR='10.0.0.1')
+        assert client.post(
+            self.URL_SIGNUP, REMOTE_ADDR='10.0.0.1'
+        ).status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert client.post(
+            self.URL_SIGNUP, REMOTE_ADDR='10.0.0.2'
+        ).status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что у каждого IP-адреса свой счётчик.'
+        )
+
+    def test_04_spoofed_forwarded_for(self, client, throttle_rates, clock):
+        throttle_rates(signup_ip='2/min')
+        statuses = [
+            client.post(
+                self.URL_SIGNUP, HTTP_X_FORWARDED_FOR=f'10.0.0.{number}'
+            ).status_code
+            for number in range(3)
+        ]
+        assert statuses[-1] == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что лимит по IP-адресу нельзя обойти, подставив '
+            'заголовок X-Forwarded-For.'
+        )
+
+    def test_05_review_writes_per_user(self, admin_client, user_client,
+                                       moderator_client, throttle_rates,
+                                       clock):
+        titles, _, _ = create_titles(admin_client)
+        throttle_rates(reviews_user='1/min')
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 5}
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        url_other = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        assert user_client.post(url_other, data=data).status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        ), (
+            'Проверьте, что создание отзывов ограничено для каждого '
+            'пользователя.'
+        )
+        assert moderator_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что чтение отзывов не ограничивается.'
+        )
+
+    def test_06_parallel_requests(self, throttle_rates, clock):
+        throttle_rates(signup_ip='10/min')
+        request = RequestFactory().post(self.URL_SIGNUP)
+        view = SimpleNamespace(throttle_scope='signup')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = list(executor.map(
+                lambda _: IPSlidingWindowThrottle().allow_request(
+                    request, view
+                ),
+                range(50)
+            ))
+        assert allowed.count(True) == 10, (
+            'Проверьте, что параллельные запросы не проходят сверх лимита.'
+        )
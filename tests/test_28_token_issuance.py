@@ -0,0 +1,46 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28TokenIssuance:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def test_01_single_lookup(self, client, moderator):
+        data = {
+            'username': moderator.username,
+            'confirmation_code': default_token_generator.make_token(moderator)
+        }
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.URL_TOKEN, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context.captured_queries) == 1, (
+            f'Проверьте, что `{self.URL_TOKEN}` загружает пользователя '
+            'одним запросом.'
+        )
+        assert '"users_user"."bio"' not in context.captured_queries[0]['sql'], (
+            'Проверьте, что для выдачи токена загружаются только нужные '
+            'поля пользователя.'
+        )
+        token = AccessToken(response.json()['token'])
+        assert (token['user_id'], token['role']) == (
+            moderator.id, 'moderator'
+        )
+
+    def test_02_benchmark_command(self, django_user_model):
+        out = StringIO()
+        call_command('benchmark_token', requests=5, users=2, stdout=out)
+        assert '1.0 запросов к БД на запрос' in out.getvalue()
+        assert not django_user_model.objects.filter(
+            username__startswith='benchmark_token_'
+        ).exists(), (
+            'Проверьте, что benchmark_token удаляет временных пользователей.'
+        )
@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import check_query_plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29UserSearch:
+
+    USERS_URL = '/api/v1/users/'
+
+    def create_users(self, django_user_model):
+        for username, email in (
+            ('Alice', 'Alice@Yamdb.fake'),
+            ('alfred', 'alfred@yamdb.fake'),
+            ('Albert', 'albert@yamdb.fake'),
+            ('bob', 'bob@yamdb.fake'),
+        ):
+            django_user_model.objects.create_user(
+                username=username, email=email
+            )
+
+    def get_usernames(self, client, query):
+        response = client.get(f'{self.USERS_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return [user['username'] for user in response.json()['results']]
+
+    def test_01_username_prefix(self, admin_client, django_user_model):
+        self.create_users(django_user_model)
+        assert self.get_usernames(admin_client, 'username_prefix=AL') == [
+            'Albert', 'alfred', 'Alice'
+        ], (
+            f'Проверьте, что `{self.USERS_URL}?username_prefix=` находит '
+            'пользователей по началу имени без учёта регистра.'
+        )
+        assert self.get_usernames(admin_client, 'username_prefix=ali') == [
+            'Alice'
+        ]
+        assert self.get_usernames(admin_client, 'username_prefix=z') == []
+
+    def test_02_email(self, admin_client, django_user_model):
+        self.create_users(django_user_model)
+        assert self.get_usernames(
+            admin_client, 'email=alice@yamdb.FAKE'
+        ) == ['Alice'], (
+            f'Проверьте, что `{self.USERS_URL}?email=` находит пользователя '
+            'по адресу без учёта регистра.'
+        )
+        assert self.get_usernames(admin_client, 'email=alice@yamdb') == []
+
+    def test_03_search_fields_follow_updates(self, admin_client,
+                                             django_user_model):
+        self.create_users(django_user_model)
+        response = admin_client.patch(
+            f'{self.USERS_URL}bob/', data={'username': 'Bobby'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        user = django_user_model.objects.get(username='Bobby')
+        user.email = 'Bobby@Yamdb.fake'
+        user.save(update_fields=('email',))
+        assert self.get_usernames(admin_client, 'username_prefix=bobb') == [
+            'Bobby'
+        ]
+        assert self.get_usernames(
+            admin_client, 'email=bobby@yamdb.fake'
+        ) == ['Bobby'], (
+            'Проверьте, что поля поиска обновляются при сохранении '
+            'пользователя.'
+        )
+
+    def test_04_query_plans(self, admin_client, django_user_model):
+        self.create_users(django_user_model)
+        for query in ('username_prefix=al', 'email=bob@yamdb.fake'):
+            check_query_plans(admin_client, f'{self.USERS_URL}?{query}')
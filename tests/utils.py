@@ -1,5 +1,13 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# Справочники из нескольких десятков строк: сортировка в памяти для них
+# дешевле индекса, поэтому временное B-дерево по ним допустимо.
+SMALL_TABLES = ('reviews_category', 'reviews_genre')
+SMALL_TABLES_SCANS = tuple(f'SCAN {table}' for table in SMALL_TABLES)
+
 check_name_and_slug_patterns = (
     (
         {
@@ -304,3 +312,43 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def get_query_plans(client, url):
+    """Выполняет GET-запрос и возвращает EXPLAIN QUERY PLAN его SELECT'ов."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со статусом '
+        '200.'
+    )
+    plans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    return plans
+
+
+def check_query_plans(client, url):
+    """Проверяет, что запросы эндпоинта не сканируют и не сортируют таблицы."""
+    for sql, plan in get_query_plans(client, url):
+        small = any(f'FROM "{table}"' in sql for table in SMALL_TABLES)
+        for step in plan:
+            table_scan = (
+                step.startswith('SCAN ')
+                and 'USING' not in step
+                and not step.startswith(SMALL_TABLES_SCANS)
+            )
+            assert not table_scan, (
+                f'Запрос к `{url}` читает таблицу целиком: {step}\n{sql}'
+            )
+            assert small or 'TEMP B-TREE' not in step, (
+                f'Запрос к `{url}` сортирует во временном B-дереве: '
+                f'{step}\n{sql}'
+            )